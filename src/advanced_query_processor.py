@@ -4,189 +4,345 @@ Orchestrates all query processing modules to handle complex code analysis reques
 """
 
 import re
-from typing import Dict, List, Optional, Any, Tuple
-
-from .query_processors import (
-    CodeGenerator,
-    DiagramGenerator,
-    WalkthroughGenerator,
-    PatternAnalyzer,
-    ApiAnalyzer,
-    LearningPathGenerator
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+from .query_processors.code_index import CodeIndex
+
+if TYPE_CHECKING:
+    from .query_processors import (
+        CodeGenerator,
+        DiagramGenerator,
+        WalkthroughGenerator,
+        PatternAnalyzer,
+        ApiAnalyzer,
+        LearningPathGenerator
+    )
+
+# Optional generators, resolved once at import time
+try:
+    from .query_processors.pattern_file_generator import generate_file_following_patterns
+except ImportError:
+    generate_file_following_patterns = None
+
+try:
+    from .query_processors.context_aware_generator import ContextAwareGenerator
+except ImportError:
+    ContextAwareGenerator = None
+
+
+# Query categories in dispatch precedence order (most specific first)
+_CATEGORY_KEYWORDS = (
+    ('file_generation', ('create a new section', 'create a new file', 'generate a file',
+                         'following the same pattern', 'following patterns', 'in the same pattern')),
+    ('code_generation', ('generate', 'create', 'scaffold', 'build', 'new component',
+                         'new feature', 'add endpoint', 'create model')),
+    ('diagram', ('diagram', 'visualize', 'architecture', 'flow chart',
+                 'dependency graph', 'class diagram', 'sequence diagram')),
+    ('walkthrough', ('walkthrough', 'guide', 'how to', 'step by step',
+                     'tutorial', 'implement', 'add feature')),
+    ('pattern_analysis', ('pattern', 'convention', 'style', 'anti-pattern',
+                          'best practice', 'naming', 'structure')),
+    ('api', ('api', 'endpoint', 'route', 'payload', 'request',
+             'response', 'rest', 'http method')),
+    ('learning', ('learn', 'understand', 'study', 'where to start',
+                  'beginner', 'onboarding', 'explore')),
 )
 
 
+def _build_keyword_matcher():
+    """Build a single multi-keyword matcher over every category keyword."""
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for rank, (category, keywords) in enumerate(_CATEGORY_KEYWORDS):
+            for keyword in keywords:
+                automaton.add_word(keyword, rank)
+        automaton.make_automaton()
+        return automaton
+    
+    # Fallback: one precompiled alternation per category
+    return [
+        re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+        for _, keywords in _CATEGORY_KEYWORDS
+    ]
+
+
+_KEYWORD_MATCHER = _build_keyword_matcher()
+
+# Responses kept per processor for repeated queries
+_RESPONSE_CACHE_SIZE = 256
+
+# Category id for queries that match no keywords
+_GENERAL_CATEGORY = len(_CATEGORY_KEYWORDS)
+
+# Extraction patterns, compiled once
+_NAME_PATTERNS = [
+    re.compile(r'(?:called|named)\s+["\']?(\w+)["\']?', re.IGNORECASE),
+    re.compile(r'component\s+["\']?(\w+)["\']?', re.IGNORECASE),
+    re.compile(r'create\s+(?:a\s+)?["\']?(\w+)["\']?', re.IGNORECASE)
+]
+_PROPS_RE = re.compile(r'with\s+props?\s+["\']?([^"\'.]+)["\']?', re.IGNORECASE)
+_COMPONENT_RE = re.compile(r'(?:component|function|class)\s+(?:called\s+)?["\']?(\w+)["\']?', re.IGNORECASE)
+_MODULE_RE = re.compile(r'(?:for|of)\s+["\']?(\S+)["\']?')
+_FEATURE_NAME_RE = re.compile(r'(?:called|named|for)\s+["\']?(\w+)["\']?')
+_ENDPOINT_RE = re.compile(r'["\']?(/[\w/{}]+)["\']?')
+_LEARN_MODULE_RE = re.compile(r'(?:module|file)\s+["\']?(\S+)["\']?')
+
+# Keyword -> category lookups, checked in insertion (precedence) order
+_DIAGRAM_TYPE_MAP = {
+    'dependency': 'dependency',
+    'class': 'class',
+    'sequence': 'sequence',
+    'flow': 'flow',
+}
+_FEATURE_TYPE_MAP = {
+    'api': 'api_endpoint',
+    'endpoint': 'api_endpoint',
+    'model': 'database_model',
+    'database': 'database_model',
+    'component': 'frontend_component',
+    'frontend': 'frontend_component',
+    'auth': 'authentication',
+    'test': 'test',
+}
+_LEARNING_GOAL_MAP = {
+    'feature': 'feature',
+    'debug': 'debugging',
+    'architect': 'architecture',
+}
+_LEARNING_LEVEL_MAP = {
+    'advanced': 'advanced',
+    'expert': 'advanced',
+    'intermediate': 'intermediate',
+}
+
+
+_DIAGRAM_FOOTER = "You can render this diagram using any Mermaid-compatible viewer."
+
+# Static help shown for queries that match no category
+_HELP_RESPONSE = (
+    "I can help you with:\n\n"
+    "1. **Code Generation** - Generate new components following your patterns\n"
+    "2. **Diagrams** - Create architecture, dependency, or flow diagrams\n"
+    "3. **Walkthroughs** - Step-by-step guides for implementing features\n"
+    "4. **Pattern Analysis** - Analyze code patterns and find anti-patterns\n"
+    "5. **API Analysis** - Analyze endpoints, generate documentation\n"
+    "6. **Learning Paths** - Get personalized learning paths for the codebase\n\n"
+    "Try asking something like:\n"
+    "- 'Generate a new API endpoint for users'\n"
+    "- 'Create an architecture diagram'\n"
+    "- 'How do I add a new feature?'\n"
+    "- 'Analyze naming patterns'\n"
+    "- 'Document the API endpoints'\n"
+    "- 'Where should I start learning this codebase?'",
+    'help'
+)
+
+
+def _lookup_keyword(query_lower: str, keyword_map: Dict[str, str], default: str) -> str:
+    """Return the value of the first keyword in keyword_map found in the query."""
+    return next((value for keyword, value in keyword_map.items() if keyword in query_lower), default)
+
+
+@lru_cache(maxsize=None)
+def _display_name(type_name: str) -> str:
+    """Return the heading form of an analyzer type key (e.g. 'god_class' -> 'God Class')."""
+    return type_name.replace('_', ' ').title()
+
+
+@lru_cache(maxsize=512)
+def _classify_query(query_lower: str) -> int:
+    """Return the id (dispatch rank) of the highest-precedence matching category."""
+    if ahocorasick is not None:
+        best = _GENERAL_CATEGORY
+        for _, rank in _KEYWORD_MATCHER.iter(query_lower):
+            if rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return best
+    
+    for rank, pattern in enumerate(_KEYWORD_MATCHER):
+        if pattern.search(query_lower):
+            return rank
+    return _GENERAL_CATEGORY
+
+
 class AdvancedQueryProcessor:
 
+    # Query category -> handler method
+    _CATEGORY_HANDLERS = {
+        'file_generation': '_handle_file_generation',
+        'code_generation': '_handle_code_generation',
+        'diagram': '_handle_diagram_generation',
+        'walkthrough': '_handle_walkthrough_generation',
+        'pattern_analysis': '_handle_pattern_analysis',
+        'api': '_handle_api_analysis',
+        'learning': '_handle_learning_path',
+    }
     
     def __init__(self, consolidated_code: str):
         self.consolidated_code = consolidated_code
         
-        # Initialize all processors
-        self.code_generator = CodeGenerator(consolidated_code)
-        self.diagram_generator = DiagramGenerator(consolidated_code)
-        self.walkthrough_generator = WalkthroughGenerator(consolidated_code)
-        self.pattern_analyzer = PatternAnalyzer(consolidated_code)
-        self.api_analyzer = ApiAnalyzer(consolidated_code)
-        self.learning_path_generator = LearningPathGenerator(consolidated_code)
+        # Responses depend only on the query and this instance's codebase, so
+        # repeated queries are served from a per-instance LRU of query -> response.
+        # It holds plain values, so a replaced processor is freed by refcounting.
+        self._responses = OrderedDict()
+        
+        # Handler functions indexed by category id, looked up once. They are kept
+        # unbound so the processor does not reference itself.
+        cls = type(self)
+        self._handlers = tuple(
+            getattr(cls, self._CATEGORY_HANDLERS[category]) for category, _ in _CATEGORY_KEYWORDS
+        ) + (cls._handle_general_query,)
+    
+    # Processors are imported and built on first use so a session only pays
+    # for the analyzers its queries actually need
+    
+    @cached_property
+    def code_index(self) -> CodeIndex:
+        return CodeIndex.from_code(self.consolidated_code)
+    
+    @cached_property
+    def code_generator(self) -> 'CodeGenerator':
+        from .query_processors.code_generator import CodeGenerator
+        return CodeGenerator(self.consolidated_code)
+    
+    @cached_property
+    def diagram_generator(self) -> 'DiagramGenerator':
+        from .query_processors.diagram_generator import DiagramGenerator
+        return DiagramGenerator(self.consolidated_code, self.code_index)
+    
+    @cached_property
+    def walkthrough_generator(self) -> 'WalkthroughGenerator':
+        from .query_processors.walkthrough_generator import WalkthroughGenerator
+        return WalkthroughGenerator(self.consolidated_code, self.code_index)
+    
+    @cached_property
+    def pattern_analyzer(self) -> 'PatternAnalyzer':
+        from .query_processors.pattern_analyzer import PatternAnalyzer
+        return PatternAnalyzer(self.consolidated_code, self.code_index)
+    
+    @cached_property
+    def api_analyzer(self) -> 'ApiAnalyzer':
+        from .query_processors.api_analyzer import ApiAnalyzer
+        return ApiAnalyzer(self.consolidated_code)
+    
+    @cached_property
+    def learning_path_generator(self) -> 'LearningPathGenerator':
+        from .query_processors.learning_path_generator import LearningPathGenerator
+        return LearningPathGenerator(self.consolidated_code, self.code_index)
+    
+    @cached_property
+    def context_generator(self) -> Optional['ContextAwareGenerator']:
+        if ContextAwareGenerator is None:
+            return None
+        return ContextAwareGenerator(self.consolidated_code)
+    
+    @cached_property
+    def _patterns_used(self) -> Dict[str, Any]:
+        # Patterns are extracted once at construction, so the summary never changes
+        return self.context_generator.get_patterns_used()
+    
+    @cached_property
+    def _framework(self) -> str:
+        # Framework detection scans the whole codebase and cannot change afterwards
+        return self.code_generator.detect_framework()
     
     def process_query(self, query: str) -> Tuple[str, str]:
         """
         Process a complex query and return the result.
         Returns: (response_text, response_type)
         """
-        query_lower = query.lower()
-# FIXME: refactor when time permits
-# Not the cleanest, but it does the job
-        if self._is_file_generation_query(query):
-            try:
-                from .query_processors.pattern_file_generator import generate_file_following_patterns
-                result = generate_file_following_patterns(query, self.consolidated_code)
-                return result, 'code_generation'
-            except ImportError:
-                return "Pattern file generator not available. Please check installation.", 'error'
-        
-        elif self._is_code_generation_query(query_lower):
-            return self._handle_code_generation(query)
-        
-        elif self._is_diagram_query(query_lower):
-            return self._handle_diagram_generation(query)
-        
-        elif self._is_walkthrough_query(query_lower):
-            return self._handle_walkthrough_generation(query)
-        
-        elif self._is_pattern_analysis_query(query_lower):
-            return self._handle_pattern_analysis(query)
-        
-        elif self._is_api_query(query_lower):
-            return self._handle_api_analysis(query)
+        response = self._responses.get(query)
+        if response is not None:
+            self._responses.move_to_end(query)
+            return response
         
-        elif self._is_learning_query(query_lower):
-            return self._handle_learning_path(query)
+        query_lower = query.lower()
+        response = self._handlers[_classify_query(query_lower)](self, query, query_lower)
         
-        else:
-            return self._handle_general_query(query)
-    
-    def _is_code_generation_query(self, query: str) -> bool:
-
-        keywords = ['generate', 'create', 'scaffold', 'build', 'new component', 
-                   'new feature', 'add endpoint', 'create model']
-        return any(keyword in query for keyword in keywords)
-    
-    def _is_file_generation_query(self, query: str) -> bool:
-
-        keywords = ['create a new section', 'create a new file', 'generate a file', 
-                   'following the same pattern', 'following patterns', 'in the same pattern']
-        return any(keyword in query.lower() for keyword in keywords)
-    
-    def _is_diagram_query(self, query: str) -> bool:
-
-        keywords = ['diagram', 'visualize', 'architecture', 'flow chart', 
-                   'dependency graph', 'class diagram', 'sequence diagram']
-        return any(keyword in query for keyword in keywords)
-    
-    def _is_walkthrough_query(self, query: str) -> bool:
-
-        keywords = ['walkthrough', 'guide', 'how to', 'step by step', 
-                   'tutorial', 'implement', 'add feature']
-        return any(keyword in query for keyword in keywords)
-    
-    def _is_pattern_analysis_query(self, query: str) -> bool:
-
-        keywords = ['pattern', 'convention', 'style', 'anti-pattern', 
-                   'best practice', 'naming', 'structure']
-        return any(keyword in query for keyword in keywords)
+        self._responses[query] = response
+        if len(self._responses) > _RESPONSE_CACHE_SIZE:
+            self._responses.popitem(last=False)
+        return response
     
-    def _is_api_query(self, query: str) -> bool:
-
-        keywords = ['api', 'endpoint', 'route', 'payload', 'request', 
-                   'response', 'rest', 'http method']
-        return any(keyword in query for keyword in keywords)
-    
-    def _is_learning_query(self, query: str) -> bool:
-
-        keywords = ['learn', 'understand', 'study', 'where to start', 
-                   'beginner', 'onboarding', 'explore']
-        return any(keyword in query for keyword in keywords)
+    def _handle_file_generation(self, query: str, query_lower: str) -> Tuple[str, str]:
+# FIXME: refactor when time permits
+        if generate_file_following_patterns is None:
+            return "Pattern file generator not available. Please check installation.", 'error'
+        
+        result = generate_file_following_patterns(query, self.consolidated_code)
+        return result, 'code_generation'
     
-    def _parse_generation_query(self, query: str) -> Tuple[str, str, Optional[Dict]]:
+    def _parse_generation_query(self, query: str) -> Tuple[str, Optional[Dict]]:
 
         # Default values
-        component_type = "component"
         component_name = "NewComponent"
         specs = {}
 # Not the cleanest, but it does the job
-        name_patterns = [
-            r'(?:called|named)\s+["\']?(\w+)["\']?',
-            r'component\s+["\']?(\w+)["\']?',
-            r'create\s+(?:a\s+)?["\']?(\w+)["\']?'
-        ]
-        
-        for pattern in name_patterns:
-            match = re.search(pattern, query, re.IGNORECASE)
+        for pattern in _NAME_PATTERNS:
+            match = pattern.search(query)
             if match:
                 component_name = match.group(1)
                 break
-# Not the cleanest, but it does the job
-        if 'service' in query.lower():
-            component_type = 'service'
-        elif 'model' in query.lower():
-            component_type = 'model'
-        elif 'api' in query.lower() or 'endpoint' in query.lower():
-            component_type = 'api'
-        elif 'test' in query.lower():
-            component_type = 'test'
 # Might need cleanup
-        props_match = re.search(r'with\s+props?\s+["\']?([^"\'.]+)["\']?', query, re.IGNORECASE)
+        props_match = _PROPS_RE.search(query)
         if props_match:
             props_str = props_match.group(1)
             specs['props'] = [prop.strip() for prop in props_str.split(',')]
         
-        return component_type, component_name, specs
+        return component_name, specs
     
-    def _handle_code_generation(self, query: str) -> Tuple[str, str]:
-# Not the cleanest, but it does the job
-        try:
-            from .query_processors.context_aware_generator import ContextAwareGenerator
-            context_generator = ContextAwareGenerator(self.consolidated_code)
+    def _handle_code_generation(self, query: str, query_lower: str) -> Tuple[str, str]:
 # Works, but could be neater
-            component_type, component_name, specs = self._parse_generation_query(query)
-            
-            # Generate code based on existing patterns
-            generated_code = context_generator.generate_component(component_name, specs)
-            
-            # Add explanation about the patterns used
-            patterns_used = context_generator.get_patterns_used()
-            
-            response = f"# Generated {component_name} Component\n\n"
-            response += "Based on your codebase analysis, I've generated this component following:\n"
-            response += f"- **Component Style**: {patterns_used['style']}\n"
-            response += f"- **State Management**: {patterns_used['state']}\n"
-            response += f"- **Styling Method**: {patterns_used['styling']}\n"
-            response += f"- **Common Patterns**: {', '.join(patterns_used['patterns'])}\n\n"
-            response += f"```{patterns_used['language']}\n{generated_code}\n```\n\n"
-            response += "This component follows the exact patterns found in your codebase."
-            
-            return response, 'code_generation'
-        except ImportError:
-            # Fallback to basic code generator
-            return self._handle_basic_code_generation(query)
+        if self.context_generator is None:
+            # Fallback to basic code generator, which names the component its own way
+            return self._handle_basic_code_generation(query, query_lower)
+        
+        component_name, specs = self._parse_generation_query(query)
+        
+        # Generate code based on existing patterns
+        generated_code = self.context_generator.generate_component(component_name, specs)
+        
+        # Add explanation about the patterns used
+        patterns_used = self._patterns_used
+        
+        response = (
+            f"# Generated {component_name} Component\n\n"
+            "Based on your codebase analysis, I've generated this component following:\n"
+            f"- **Component Style**: {patterns_used['style']}\n"
+            f"- **State Management**: {patterns_used['state']}\n"
+            f"- **Styling Method**: {patterns_used['styling']}\n"
+            f"- **Common Patterns**: {', '.join(patterns_used['patterns'])}\n\n"
+            f"```{patterns_used['language']}\n{generated_code}\n```\n\n"
+            "This component follows the exact patterns found in your codebase."
+        )
+        
+        return response, 'code_generation'
     
-    def _handle_basic_code_generation(self, query: str) -> Tuple[str, str]:
+    def _handle_basic_code_generation(self, query: str, query_lower: str) -> Tuple[str, str]:
 
-        # Parse query
-        component_match = re.search(r'(?:component|function|class)\s+(?:called\s+)?["\']?(\w+)["\']?', query, re.IGNORECASE)
+        # Parse query; _COMPONENT_RE also takes the name after "function" or "class",
+        # which the context-aware name patterns do not
+        component_match = _COMPONENT_RE.search(query)
         component_name = component_match.group(1) if component_match else 'NewComponent'
 # TODO: revisit this later
-        if 'function' in query.lower():
+        if 'function' in query_lower:
             code = self.code_generator.generate_function(component_name)
             response = f"# Generated Function: {component_name}\n\n```python\n{code}\n```"
-        elif 'class' in query.lower():
+        elif 'class' in query_lower:
             code = self.code_generator.generate_class(component_name)
             response = f"# Generated Class: {component_name}\n\n```python\n{code}\n```"
         else:
             # Default to component
-            framework = self.code_generator.detect_framework()
+            framework = self._framework
             if framework == 'react':
                 code = self.code_generator.generate_react_component(component_name)
                 response = f"# Generated React Component: {component_name}\n\n```javascript\n{code}\n```"
@@ -199,21 +355,13 @@ class AdvancedQueryProcessor:
         
         return response, 'code_generation'
     
-    def _handle_diagram_generation(self, query: str) -> Tuple[str, str]:
+    def _handle_diagram_generation(self, query: str, query_lower: str) -> Tuple[str, str]:
 
-        diagram_type = 'architecture'
-        module_name = None
 # Might need cleanup
-        if 'dependency' in query.lower():
-            diagram_type = 'dependency'
-        elif 'class' in query.lower():
-            diagram_type = 'class'
-        elif 'sequence' in query.lower():
-            diagram_type = 'sequence'
-        elif 'flow' in query.lower():
-            diagram_type = 'flow'
+        diagram_type = _lookup_keyword(query_lower, _DIAGRAM_TYPE_MAP, 'architecture')
+        module_name = None
 # TODO: revisit this later
-        module_match = re.search(r'(?:for|of)\s+["\']?(\S+)["\']?', query)
+        module_match = _MODULE_RE.search(query)
         if module_match:
             module_name = module_match.group(1)
         
@@ -233,172 +381,157 @@ class AdvancedQueryProcessor:
         else:
             mermaid_code = self.diagram_generator.generate_architecture_diagram()
         
-        response = f"# {diagram_type.title()} Diagram\n\n"
-        response += "```mermaid\n"
-        response += mermaid_code
-        response += "\n```\n\n"
-        response += "You can render this diagram using any Mermaid-compatible viewer."
+        response = (
+            f"# {diagram_type.title()} Diagram\n\n"
+            f"```mermaid\n{mermaid_code}\n```\n\n{_DIAGRAM_FOOTER}"
+        )
         
         return response, 'diagram'
     
-    def _handle_walkthrough_generation(self, query: str) -> Tuple[str, str]:
+    def _handle_walkthrough_generation(self, query: str, query_lower: str) -> Tuple[str, str]:
 # Might need cleanup
-        feature_type = 'generic'
+        feature_type = _lookup_keyword(query_lower, _FEATURE_TYPE_MAP, 'generic')
         feature_name = 'NewFeature'
-        
-        if 'api' in query.lower() or 'endpoint' in query.lower():
-            feature_type = 'api_endpoint'
-        elif 'model' in query.lower() or 'database' in query.lower():
-            feature_type = 'database_model'
-        elif 'component' in query.lower() or 'frontend' in query.lower():
-            feature_type = 'frontend_component'
-        elif 'auth' in query.lower():
-            feature_type = 'authentication'
-        elif 'test' in query.lower():
-            feature_type = 'test'
 # TODO: revisit this later
-        name_match = re.search(r'(?:called|named|for)\s+["\']?(\w+)["\']?', query)
+        name_match = _FEATURE_NAME_RE.search(query)
         if name_match:
             feature_name = name_match.group(1)
 # Quick workaround for now
-        if 'understand' in query.lower() or 'explain' in query.lower():
+        if 'understand' in query_lower or 'explain' in query_lower:
             walkthrough = self.walkthrough_generator.generate_understanding_walkthrough(feature_name)
         else:
             walkthrough = self.walkthrough_generator.generate_feature_walkthrough(feature_name, feature_type)
         
         return walkthrough, 'walkthrough'
     
-    def _handle_pattern_analysis(self, query: str) -> Tuple[str, str]:
+    def _handle_pattern_analysis(self, query: str, query_lower: str) -> Tuple[str, str]:
 
-        if 'anti-pattern' in query.lower() or 'issue' in query.lower():
+        if 'anti-pattern' in query_lower or 'issue' in query_lower:
             anti_patterns = self.pattern_analyzer.find_anti_patterns()
             
-            response = "# Code Anti-Patterns Found\n\n"
+            parts = ["# Code Anti-Patterns Found\n\n"]
             if anti_patterns:
                 for pattern in anti_patterns:
-                    response += f"## {pattern['type'].replace('_', ' ').title()}\n"
-                    response += f"- **Severity**: {pattern['severity']}\n"
-                    response += f"- **Description**: {pattern['description']}\n"
-                    response += f"- **Recommendation**: {pattern['recommendation']}\n"
+                    parts.append(
+                        f"## {_display_name(pattern['type'])}\n"
+                        f"- **Severity**: {pattern['severity']}\n"
+                        f"- **Description**: {pattern['description']}\n"
+                        f"- **Recommendation**: {pattern['recommendation']}\n"
+                    )
                     if 'file' in pattern:
-                        response += f"- **File**: {pattern['file']}\n"
-                    response += "\n"
+                        parts.append(f"- **File**: {pattern['file']}\n")
+                    parts.append("\n")
             else:
-                response += "No significant anti-patterns found!\n"
+                parts.append("No significant anti-patterns found!\n")
             
-            return response, 'analysis'
+            return ''.join(parts), 'analysis'
         
-        elif 'naming' in query.lower():
+        elif 'naming' in query_lower:
             naming_patterns = self.pattern_analyzer.check_naming_patterns()
             
-            response = "# Naming Convention Analysis\n\n"
+            parts = ["# Naming Convention Analysis\n\n"]
             for category, patterns in naming_patterns.items():
                 if isinstance(patterns, dict) and 'total' in patterns:
-                    response += f"## {category.title()}\n"
-                    response += f"- Total: {patterns['total']}\n"
+                    parts.append(f"## {category.title()}\n- Total: {patterns['total']}\n")
                     if 'dominant_style' in patterns:
-                        response += f"- Dominant style: **{patterns['dominant_style']}**\n"
+                        parts.append(f"- Dominant style: **{patterns['dominant_style']}**\n")
                     if 'examples' in patterns and patterns['examples']:
-                        response += f"- Examples: {', '.join(patterns['examples'][:5])}\n"
-                    response += "\n"
+                        parts.append(f"- Examples: {', '.join(patterns['examples'][:5])}\n")
+                    parts.append("\n")
             
-            return response, 'analysis'
+            return ''.join(parts), 'analysis'
         
         else:
             # General pattern report
             report = self.pattern_analyzer.generate_pattern_report()
             return report, 'analysis'
     
-    def _handle_api_analysis(self, query: str) -> Tuple[str, str]:
+    def _handle_api_analysis(self, query: str, query_lower: str) -> Tuple[str, str]:
 
-        if 'document' in query.lower():
+        if 'document' in query_lower:
             documentation = self.api_analyzer.generate_api_documentation()
             return documentation, 'documentation'
         
-        elif 'issue' in query.lower() or 'problem' in query.lower():
+        elif 'issue' in query_lower or 'problem' in query_lower:
             issues = self.api_analyzer.find_api_issues()
             
-            response = "# API Design Issues\n\n"
+            parts = ["# API Design Issues\n\n"]
             if issues:
                 for issue in issues:
-                    response += f"## {issue['type'].replace('_', ' ').title()}\n"
-                    response += f"- **Severity**: {issue['severity']}\n"
-                    response += f"- **Description**: {issue['description']}\n"
-                    response += f"- **Recommendation**: {issue['recommendation']}\n"
+                    parts.append(
+                        f"## {_display_name(issue['type'])}\n"
+                        f"- **Severity**: {issue['severity']}\n"
+                        f"- **Description**: {issue['description']}\n"
+                        f"- **Recommendation**: {issue['recommendation']}\n"
+                    )
                     if 'details' in issue:
-                        response += f"- **Details**: {issue['details']}\n"
-                    response += "\n"
+                        parts.append(f"- **Details**: {issue['details']}\n")
+                    parts.append("\n")
             else:
-                response += "No significant API issues found!\n"
+                parts.append("No significant API issues found!\n")
             
-            return response, 'analysis'
+            return ''.join(parts), 'analysis'
         
-        elif 'endpoint' in query.lower() and ('analyze' in query.lower() or 'explain' in query.lower()):
+        elif 'endpoint' in query_lower and ('analyze' in query_lower or 'explain' in query_lower):
 # Might need cleanup
-            path_match = re.search(r'["\']?(/[\w/{}]+)["\']?', query)
-            if path_match:
-                endpoint_path = path_match.group(1)
-                analysis = self.api_analyzer.check_endpoint_interactions(endpoint_path)
+            path_match = _ENDPOINT_RE.search(query)
+            if not path_match:
+                return ("Which endpoint should I analyze? Include its path, "
+                        "e.g. 'analyze endpoint /api/users'."), 'help'
+            
+            endpoint_path = path_match.group(1)
+            analysis = self.api_analyzer.check_endpoint_interactions(endpoint_path)
+            
+            parts = [f"# Endpoint Analysis: {endpoint_path}\n\n"]
+            if 'error' not in analysis:
+                parts.append(
+                    f"- **Methods**: {', '.join(analysis['endpoint']['methods'])}\n"
+                    f"- **Handler**: `{analysis['endpoint']['handler']}`\n"
+                    f"- **Type**: {analysis['endpoint']['type']}\n\n"
+                )
                 
-                response = f"# Endpoint Analysis: {endpoint_path}\n\n"
-                if 'error' not in analysis:
-                    response += f"- **Methods**: {', '.join(analysis['endpoint']['methods'])}\n"
-                    response += f"- **Handler**: `{analysis['endpoint']['handler']}`\n"
-                    response += f"- **Type**: {analysis['endpoint']['type']}\n\n"
-                    
-                    if analysis['request_model']:
-                        response += "## Request Model\n"
-                        response += f"- **Name**: {analysis['request_model']['name']}\n"
-                        response += "- **Fields**:\n"
-                        for field in analysis['request_model'].get('fields', []):
-                            response += f"  - `{field['name']}`: {field['type']}\n"
-                        response += "\n"
-                    
-                    if analysis['database_operations']:
-                        response += f"## Database Operations\n"
-                        response += f"{', '.join(analysis['database_operations'])}\n\n"
-                else:
-                    response += "Endpoint not found.\n"
+                if analysis['request_model']:
+                    parts.append(
+                        "## Request Model\n"
+                        f"- **Name**: {analysis['request_model']['name']}\n"
+                        "- **Fields**:\n"
+                    )
+                    parts.extend(
+                        f"  - `{field['name']}`: {field['type']}\n"
+                        for field in analysis['request_model'].get('fields', [])
+                    )
+                    parts.append("\n")
                 
-                return response, 'analysis'
+                if analysis['database_operations']:
+                    parts.append(f"## Database Operations\n{', '.join(analysis['database_operations'])}\n\n")
+            else:
+                parts.append("Endpoint not found.\n")
+            
+            return ''.join(parts), 'analysis'
         
         # Default API structure analysis
         api_structure = self.api_analyzer.check_api_structure()
         
-        response = "# API Structure Analysis\n\n"
-        response += f"- **Total Endpoints**: {api_structure['total_endpoints']}\n"
-        response += f"- **Frameworks**: {', '.join(api_structure['frameworks_used'])}\n"
-        response += f"- **RESTful Compliance**: {api_structure['restful_analysis']['compliance_score']}%\n\n"
-        
-        response += "## Endpoints by Method\n"
-        for method, count in api_structure['endpoints_by_method'].items():
-            response += f"- {method}: {count}\n"
-        response += "\n"
-        
-        response += "## Endpoints by Type\n"
-        for endpoint_type, count in api_structure['endpoints_by_type'].items():
-            response += f"- {endpoint_type}: {count}\n"
+        parts = [
+            "# API Structure Analysis\n\n"
+            f"- **Total Endpoints**: {api_structure['total_endpoints']}\n"
+            f"- **Frameworks**: {', '.join(api_structure['frameworks_used'])}\n"
+            f"- **RESTful Compliance**: {api_structure['restful_analysis']['compliance_score']}%\n\n"
+            "## Endpoints by Method\n"
+        ]
+        parts.extend(f"- {method}: {count}\n" for method, count in api_structure['endpoints_by_method'].items())
+        parts.append("\n## Endpoints by Type\n")
+        parts.extend(f"- {endpoint_type}: {count}\n"
+                     for endpoint_type, count in api_structure['endpoints_by_type'].items())
         
-        return response, 'analysis'
+        return ''.join(parts), 'analysis'
     
-    def _handle_learning_path(self, query: str) -> Tuple[str, str]:
+    def _handle_learning_path(self, query: str, query_lower: str) -> Tuple[str, str]:
 # Might need cleanup
-        goal = 'general'
-        level = 'beginner'
-        
-        if 'feature' in query.lower():
-            goal = 'feature'
-        elif 'debug' in query.lower():
-            goal = 'debugging'
-        elif 'architect' in query.lower():
-            goal = 'architecture'
-        
-        if 'advanced' in query.lower() or 'expert' in query.lower():
-            level = 'advanced'
-        elif 'intermediate' in query.lower():
-            level = 'intermediate'
+        goal = _lookup_keyword(query_lower, _LEARNING_GOAL_MAP, 'general')
+        level = _lookup_keyword(query_lower, _LEARNING_LEVEL_MAP, 'beginner')
 # TODO: revisit this later
-        module_match = re.search(r'(?:module|file)\s+["\']?(\S+)["\']?', query)
+        module_match = _LEARN_MODULE_RE.search(query)
         if module_match:
             module_name = module_match.group(1)
             study_guide = self.learning_path_generator.generate_module_study_guide(module_name)
@@ -407,46 +540,28 @@ class AdvancedQueryProcessor:
         # Generate learning path
         learning_path = self.learning_path_generator.generate_learning_path(goal, level)
         
-        response = f"# Learning Path: {goal.title()} ({level.title()} Level)\n\n"
+        parts = [f"# Learning Path: {goal.title()} ({level.title()} Level)\n\n"]
         
         for step in learning_path:
-            response += f"## Step {step['step']}: {step['title']}\n"
-            response += f"{step['description']}\n\n"
+            parts.append(f"## Step {step['step']}: {step['title']}\n{step['description']}\n\n")
             
             if step.get('modules'):
-                response += "**Modules to study:**\n"
-                for module in step['modules']:
-                    response += f"- `{module}`\n"
-                response += "\n"
+                parts.append("**Modules to study:**\n")
+                parts.extend(f"- `{module}`\n" for module in step['modules'])
+                parts.append("\n")
             
             if step.get('concepts'):
-                response += f"**Key concepts:** {', '.join(step['concepts'])}\n\n"
+                parts.append(f"**Key concepts:** {', '.join(step['concepts'])}\n\n")
             
             if step.get('tasks'):
-                response += "**Tasks:**\n"
-                for task in step['tasks']:
-                    response += f"- {task}\n"
-                response += "\n"
+                parts.append("**Tasks:**\n")
+                parts.extend(f"- {task}\n" for task in step['tasks'])
+                parts.append("\n")
             
-            response += "---\n\n"
+            parts.append("---\n\n")
         
-        return response, 'learning'
+        return ''.join(parts), 'learning'
     
-    def _handle_general_query(self, query: str) -> Tuple[str, str]:
-
-        response = "I can help you with:\n\n"
-        response += "1. **Code Generation** - Generate new components following your patterns\n"
-        response += "2. **Diagrams** - Create architecture, dependency, or flow diagrams\n"
-        response += "3. **Walkthroughs** - Step-by-step guides for implementing features\n"
-        response += "4. **Pattern Analysis** - Analyze code patterns and find anti-patterns\n"
-        response += "5. **API Analysis** - Analyze endpoints, generate documentation\n"
-        response += "6. **Learning Paths** - Get personalized learning paths for the codebase\n\n"
-        response += "Try asking something like:\n"
-        response += "- 'Generate a new API endpoint for users'\n"
-        response += "- 'Create an architecture diagram'\n"
-        response += "- 'How do I add a new feature?'\n"
-        response += "- 'Analyze naming patterns'\n"
-        response += "- 'Document the API endpoints'\n"
-        response += "- 'Where should I start learning this codebase?'"
-        
-        return response, 'help'
\ No newline at end of file
+    def _handle_general_query(self, query: str, query_lower: str) -> Tuple[str, str]:
+
+        return _HELP_RESPONSE
@@ -3,9 +3,129 @@ Analysis Pipeline Module for CodeLve
 Handles the main analysis routing and framework-agnostic pipeline logic
 """
 
+import re
+from collections import Counter
+from functools import cached_property, lru_cache
 from pathlib import Path
 import time
-import torch
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Query keyword tables, matched as substrings of the lowercased query
+_ENTITY_INDICATORS = ('component', 'class', 'struct', 'interface', 'module', 'service', 'controller')
+_ACTION_WORDS = ('explain', 'analyze', 'show', 'describe', 'what is', 'how does', 'teach', 'guide')
+_FUNCTION_KEYWORDS = ('function', 'method', 'func', 'def')
+_FUNCTION_ACTION_WORDS = ('explain', 'show', 'analyze')
+_FILE_INDICATORS = ('file', 'analyze', 'show', 'explain')
+_SEARCH_WORDS = ('find', 'search', 'list', 'show all', 'locate')
+_MODULE_INDICATORS = ('module', 'directory', 'folder', 'package', 'namespace', 'feature')
+_ARCHITECTURE_WORDS = ('architecture', 'structure', 'overview', 'map', 'diagram')
+
+# Bit flags reported by _scan_query, one per keyword table
+_ENTITY_FLAG = 1 << 0
+_ACTION_FLAG = 1 << 1
+_FUNCTION_FLAG = 1 << 2
+_FROM_FLAG = 1 << 3
+_FUNCTION_ACTION_FLAG = 1 << 4
+_FILE_FLAG = 1 << 5
+_DOT_FLAG = 1 << 6
+_SEARCH_FLAG = 1 << 7
+_MODULE_FLAG = 1 << 8
+_ARCHITECTURE_FLAG = 1 << 9
+
+_QUERY_FLAG_KEYWORDS = (
+    (_ENTITY_FLAG, _ENTITY_INDICATORS),
+    (_ACTION_FLAG, _ACTION_WORDS),
+    (_FUNCTION_FLAG, _FUNCTION_KEYWORDS),
+    (_FROM_FLAG, ('from',)),
+    (_FUNCTION_ACTION_FLAG, _FUNCTION_ACTION_WORDS),
+    (_FILE_FLAG, _FILE_INDICATORS),
+    (_DOT_FLAG, ('.',)),
+    (_SEARCH_FLAG, _SEARCH_WORDS),
+    (_MODULE_FLAG, _MODULE_INDICATORS),
+    (_ARCHITECTURE_FLAG, _ARCHITECTURE_WORDS),
+)
+
+
+def _build_flag_matcher():
+    """Build a single multi-keyword matcher that maps each keyword to its flags."""
+    if ahocorasick is not None:
+        keyword_flags = {}
+        for flag, keywords in _QUERY_FLAG_KEYWORDS:
+            for keyword in keywords:
+                keyword_flags[keyword] = keyword_flags.get(keyword, 0) | flag
+        automaton = ahocorasick.Automaton()
+        for keyword, flags in keyword_flags.items():
+            automaton.add_word(keyword, flags)
+        automaton.make_automaton()
+        return automaton
+    
+    # Fallback: one precompiled alternation per flag
+    return [
+        (flag, re.compile('|'.join(re.escape(keyword) for keyword in keywords)))
+        for flag, keywords in _QUERY_FLAG_KEYWORDS
+    ]
+
+
+_FLAG_MATCHER = _build_flag_matcher()
+
+
+@lru_cache(maxsize=512)
+def _scan_query(query_lower):
+    """Return the OR of the flags of every keyword table that matches the query."""
+    flags = 0
+    if ahocorasick is not None:
+        for _, keyword_flags in _FLAG_MATCHER.iter(query_lower):
+            flags |= keyword_flags
+        return flags
+    
+    for flag, pattern in _FLAG_MATCHER:
+        if pattern.search(query_lower):
+            flags |= flag
+    return flags
+
+# Extraction tables
+_ENTITY_KEYWORDS = frozenset(('component', 'class', 'struct', 'interface', 'module', 'service'))
+_ENTITY_EXTENSIONS = ('.tsx', '.jsx', '.vue', '.py', '.java', '.cs', '.cpp', '.go', '.rs')
+_FILE_EXTENSIONS = ('.js', '.ts', '.tsx', '.jsx', '.py', '.java', '.cs', '.cpp', '.c', '.go', '.rs',
+                    '.php', '.rb', '.swift', '.kt', '.vue', '.html', '.css')
+_FUNCTION_QUERY_WORDS = ('explain', 'analyze', 'show', 'describe')
+_SEARCH_FILTER_WORDS = frozenset(('find', 'search', 'list', 'show', 'all', 'locate', 'get'))
+
+# Analysis time estimates per context complexity: (simple query, complex query)
+_TIME_ESTIMATES = {
+    'low': ('< 5 seconds', '5-15 seconds'),
+    'medium': ('10-20 seconds', '15-30 seconds'),
+    'high': ('20-45 seconds', '30-60 seconds'),
+    'very_high': ('45-90 seconds', '60-120 seconds'),
+}
+
+# Fixed head of the AI fallback prompt, tokenized once per pipeline. It ends right
+# before a space so byte-level BPE splits the full prompt at the same boundary.
+_PROMPT_PREFIX = "Analyze this codebase and answer:"
+
+# Context scanning: file header lines, a blank line after each newline, and the first line
+_FILEPATH_LINE_RE = re.compile(r'\nfilepath:///(.*)')
+_FIRST_FILEPATH_LINE_RE = re.compile(r'filepath:///(.*)')
+_BLANK_LINE_RE = re.compile(r'\n(?=[^\S\n]*(?:\n|\Z))')
+_BLANK_FIRST_LINE_RE = re.compile(r'[^\S\n]*(?:\n|\Z)')
+
+
+# (epoch second, formatted local time) of the last response timestamp
+_last_timestamp = (None, '')
+
+
+def _timestamp():
+    """Return the current local time as 'YYYY-MM-DD HH:MM:SS', formatted once per second."""
+    global _last_timestamp
+    now = int(time.time())
+    if now != _last_timestamp[0]:
+        _last_timestamp = (now, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now)))
+    return _last_timestamp[1]
+
 
 class AnalysisPipeline:
 
@@ -14,60 +134,75 @@ class AnalysisPipeline:
     # Works, but could be neater
         self.ai_client = ai_client
         self.framework_detector = framework_detector
+        # Detector method name -> (codebase_context, result) for the last context seen
+        self._detection_cache = {}
+        # (context head, token ids) for the last context given to the AI fallback
+        self._context_ids_cache = None
+        
+        # INTELLIGENT ANALYSIS ROUTING (Framework Agnostic): (predicate, route) pairs in
+        # priority order. A route returns None when it cannot extract its target,
+        # letting the next matching route try.
+        self._routes = (
+            (self._is_component_or_class_query, self._route_entity),     # 1. Component/Class - WITH ARCHITECTURE
+            (self._is_module_query, self._route_module),                 # 2. Module/Package
+            (self._is_function_or_method_query, self._route_function),   # 3. Function/Method
+            (self._is_file_query, self._route_file),                     # 4. File
+            (self._is_search_query, self._route_search),                 # 5. Search
+            (self._is_architecture_query, self._route_architecture),     # 6. Architecture
+        )
+    
+    # Analyzers hold no per-query state, so each is built once on first use
+    
+    @cached_property
+    def entity_analyzer(self):
+        from .entity_analyzer import EntityAnalyzer
+        return EntityAnalyzer(self.framework_detector)
+    
+    @cached_property
+    def search_utils(self):
+        from .search_utilities import SearchUtilities
+        return SearchUtilities(self.framework_detector)
+    
+    @cached_property
+    def architecture_analyzer(self):
+        from .architecture_analyzer import ArchitectureAnalyzer
+        return ArchitectureAnalyzer(self.framework_detector)
+    
+    def _detect(self, method_name, codebase_context):
+        # Detection rescans the whole context, which rarely changes between queries.
+        # The cached context is compared by value; identical objects short-circuit.
+        cached = self._detection_cache.get(method_name)
+        if cached is not None and cached[0] == codebase_context:
+            return cached[1]
+        result = getattr(self.framework_detector, method_name)(codebase_context)
+        self._detection_cache[method_name] = (codebase_context, result)
+        return result
+    
+    @cached_property
+    def _prompt_prefix_ids(self):
+        return self.ai_client.tokenizer.encode(_PROMPT_PREFIX, add_special_tokens=False)
+    
+    def _context_ids(self, codebase_context):
+        # The prompt only sees the first 1000 characters, so that slice is the key
+        context_head = codebase_context[:1000]
+        if self._context_ids_cache is not None and self._context_ids_cache[0] == context_head:
+            return self._context_ids_cache[1]
+        ids = self.ai_client.tokenizer.encode(f"{context_head}...", add_special_tokens=False)
+        self._context_ids_cache = (context_head, ids)
+        return ids
     
     def framework_agnostic_analysis_pipeline(self, query, codebase_context):
 
         try:
             query_lower = query.lower()
-            detected_framework = self.framework_detector.detect_framework_or_language(codebase_context)
-            
-            # INTELLIGENT ANALYSIS ROUTING (Framework Agnostic)
-            
-            # 1. Component/Class Analysis - WITH ARCHITECTURE
-            if self._is_component_or_class_query(query_lower):
-                entity_name = self._get_entity_name(query, detected_framework)
-                if entity_name:
-                    from .entity_analyzer import EntityAnalyzer
-                    analyzer = EntityAnalyzer(self.framework_detector)
-                    return analyzer.check_entity_with_architecture(query, codebase_context, entity_name, detected_framework)
-            
-            # 2. Module/Package Analysis
-            if self._is_module_query(query_lower):
-                module_path = self._get_module_path(query)
-                if module_path:
-                    from .search_utilities import SearchUtilities
-                    search_utils = SearchUtilities(self.framework_detector)
-                    return search_utils.check_module(query, codebase_context, module_path, detected_framework)
-            
-            # 3. Function/Method Analysis
-            if self._is_function_or_method_query(query_lower):
-                function_info = self._get_function_info(query)
-                if function_info:
-                    from .search_utilities import SearchUtilities
-                    search_utils = SearchUtilities(self.framework_detector)
-                    return search_utils.check_function_or_method(query, codebase_context, function_info, detected_framework)
+            flags = _scan_query(query_lower)
+            detected_framework = self._detect('detect_framework_or_language', codebase_context)
             
-            # 4. File Analysis
-            if self._is_file_query(query_lower):
-                file_name = self._get_file_name(query)
-                if file_name:
-                    from .search_utilities import SearchUtilities
-                    search_utils = SearchUtilities(self.framework_detector)
-                    return search_utils.check_file(query, codebase_context, file_name, detected_framework)
-            
-            # 5. Search Queries
-            if self._is_search_query(query_lower):
-                search_term = self._get_search_term(query)
-                if search_term:
-                    from .search_utilities import SearchUtilities
-                    search_utils = SearchUtilities(self.framework_detector)
-                    return search_utils.search_codebase(codebase_context, search_term, detected_framework)
-            
-            # 6. Architecture Analysis
-            if any(word in query_lower for word in ['architecture', 'structure', 'overview', 'map', 'diagram']):
-                from .architecture_analyzer import ArchitectureAnalyzer
-                arch_analyzer = ArchitectureAnalyzer(self.framework_detector)
-                return arch_analyzer.check_codebase_architecture(codebase_context, detected_framework)
+            for is_match, route in self._routes:
+                if is_match(flags):
+                    result = route(query, codebase_context, detected_framework)
+                    if result is not None:
+                        return result
             
             # 7. AI Model Response (Fallback)
             if self.ai_client.model and self.ai_client.tokenizer:
@@ -80,33 +215,72 @@ class AnalysisPipeline:
     
     # QUERY TYPE DETECTION (Framework Agnostic)
     
-    def _is_component_or_class_query(self, query_lower):
+    # Each predicate tests the keyword flags computed once by _scan_query
+    
+    def _is_component_or_class_query(self, flags):
 
-        entity_indicators = ['component', 'class', 'struct', 'interface', 'module', 'service', 'controller']
-        action_words = ['explain', 'analyze', 'show', 'describe', 'what is', 'how does', 'teach', 'guide']
-        
-        return (any(indicator in query_lower for indicator in entity_indicators) and 
-                any(action in query_lower for action in action_words))
+        return bool(flags & _ENTITY_FLAG) and bool(flags & _ACTION_FLAG)
+    
+    def _is_function_or_method_query(self, flags):
+
+        return bool(flags & _FUNCTION_FLAG) or bool(flags & _FROM_FLAG) and bool(flags & _FUNCTION_ACTION_FLAG)
     
-    def _is_function_or_method_query(self, query_lower):
+    def _is_file_query(self, flags):
 
-        return (any(keyword in query_lower for keyword in ['function', 'method', 'func', 'def']) or 
-                'from' in query_lower and any(word in query_lower for word in ['explain', 'show', 'analyze']))
+        return bool(flags & _FILE_FLAG) and bool(flags & _DOT_FLAG)
     
-    def _is_file_query(self, query_lower):
+    def _is_search_query(self, flags):
 
-        file_indicators = ['file', 'analyze', 'show', 'explain']
-        return any(indicator in query_lower for indicator in file_indicators) and '.' in query_lower
+        return bool(flags & _SEARCH_FLAG)
     
-    def _is_search_query(self, query_lower):
+    def _is_module_query(self, flags):
 
-        search_words = ['find', 'search', 'list', 'show all', 'locate']
-        return any(word in query_lower for word in search_words)
+        return bool(flags & _MODULE_FLAG)
     
-    def _is_module_query(self, query_lower):
+    def _is_architecture_query(self, flags):
 
-        module_indicators = ['module', 'directory', 'folder', 'package', 'namespace', 'feature']
-        return any(indicator in query_lower for indicator in module_indicators)
+        return bool(flags & _ARCHITECTURE_FLAG)
+    
+    # ROUTES: extract the target, then hand off to the matching analyzer
+    
+    def _route_entity(self, query, codebase_context, detected_framework):
+
+        entity_name = self._get_entity_name(query, detected_framework)
+        if entity_name:
+            return self.entity_analyzer.check_entity_with_architecture(query, codebase_context, entity_name, detected_framework)
+        return None
+    
+    def _route_module(self, query, codebase_context, detected_framework):
+
+        module_path = self._get_module_path(query)
+        if module_path:
+            return self.search_utils.check_module(query, codebase_context, module_path, detected_framework)
+        return None
+    
+    def _route_function(self, query, codebase_context, detected_framework):
+
+        function_info = self._get_function_info(query)
+        if function_info:
+            return self.search_utils.check_function_or_method(query, codebase_context, function_info, detected_framework)
+        return None
+    
+    def _route_file(self, query, codebase_context, detected_framework):
+
+        file_name = self._get_file_name(query)
+        if file_name:
+            return self.search_utils.check_file(query, codebase_context, file_name, detected_framework)
+        return None
+    
+    def _route_search(self, query, codebase_context, detected_framework):
+
+        search_term = self._get_search_term(query)
+        if search_term:
+            return self.search_utils.search_codebase(codebase_context, search_term, detected_framework)
+        return None
+    
+    def _route_architecture(self, query, codebase_context, detected_framework):
+
+        return self.architecture_analyzer.check_codebase_architecture(codebase_context, detected_framework)
     
     # EXTRACTION METHODS (Framework Agnostic)
     
@@ -115,15 +289,13 @@ class AnalysisPipeline:
         words = query.split()
         
         # Look for word before entity type keywords
-        entity_keywords = ['component', 'class', 'struct', 'interface', 'module', 'service']
         for i, word in enumerate(words):
-            if word.lower() in entity_keywords and i > 0:
+            if word.lower() in _ENTITY_KEYWORDS and i > 0:
                 return words[i-1].strip('.,!?')
         
         # Look for file extensions specific to frameworks
-        extensions = ['.tsx', '.jsx', '.vue', '.py', '.java', '.cs', '.cpp', '.go', '.rs']
         for word in words:
-            if any(word.endswith(ext) for ext in extensions):
+            if word.endswith(_ENTITY_EXTENSIONS):
                 return Path(word).stem
         
         # Look for capitalized words (likely class/component names)
@@ -139,7 +311,7 @@ class AnalysisPipeline:
             parts = query.split('from')
             if len(parts) == 2:
                 function_name = parts[0].strip()
-                for word in ['explain', 'analyze', 'show', 'describe']:
+                for word in _FUNCTION_QUERY_WORDS:
                     function_name = function_name.replace(word, '').strip()
                 file_name = parts[1].strip()
                 return {'function': function_name, 'file': file_name}
@@ -149,17 +321,15 @@ class AnalysisPipeline:
     def _get_file_name(self, query):
 
         words = query.split()
-        common_extensions = ['.js', '.ts', '.tsx', '.jsx', '.py', '.java', '.cs', '.cpp', '.c', '.go', '.rs', '.php', '.rb', '.swift', '.kt', '.vue', '.html', '.css']
         for word in words:
-            if '.' in word and any(ext in word for ext in common_extensions):
+            if '.' in word and any(ext in word for ext in _FILE_EXTENSIONS):
                 return word
         return None
     
     def _get_search_term(self, query):
 
-        search_words = ['find', 'search', 'list', 'show', 'all', 'locate', 'get']
         words = query.split()
-        filtered_words = [word for word in words if word.lower() not in search_words]
+        filtered_words = [word for word in words if word.lower() not in _SEARCH_FILTER_WORDS]
         return ' '.join(filtered_words) if filtered_words else None
     
     def _get_module_path(self, query):
@@ -173,20 +343,30 @@ class AnalysisPipeline:
     def _generate_ai_response(self, query, codebase_context):
 
         try:
-            prompt = f"Analyze this codebase and answer: {query}\n\nCode context:\n{codebase_context[:1000]}..."
+            # torch is only needed on the model path; importing it up front costs seconds
+            import torch
+            
+            tokenizer = self.ai_client.tokenizer
+            
+            # Only the query is tokenized per call; special tokens and truncation
+            # are applied the same way encode(..., truncation=True) would
+            prompt_ids = (self._prompt_prefix_ids +
+                          tokenizer.encode(f" {query}\n\nCode context:\n", add_special_tokens=False) +
+                          self._context_ids(codebase_context))
+            max_content = self.ai_client.max_length - tokenizer.num_special_tokens_to_add()
+            prompt_ids = tokenizer.build_inputs_with_special_tokens(prompt_ids[:max_content])
             
-            inputs = self.ai_client.tokenizer.encode(
-                prompt, return_tensors='pt', max_length=self.ai_client.max_length, truncation=True)
-            inputs = inputs.to(self.ai_client.device)
+            inputs = torch.tensor([prompt_ids], device=self.ai_client.device)
             
-            with torch.no_grad():
+            with torch.inference_mode():
                 outputs = self.ai_client.model.generate(
                     inputs,
                     max_length=inputs.shape[1] + 100,
                     num_return_sequences=1,
-                    temperature=0.7,
+                    num_beams=1,
                     pad_token_id=self.ai_client.tokenizer.eos_token_id,
-                    do_sample=True
+                    do_sample=False,  # Greedy: one sequence, no sampling overhead
+                    use_cache=True
                 )
             
             response = self.ai_client.tokenizer.decode(
@@ -200,8 +380,8 @@ class AnalysisPipeline:
 
     def _get_fallback_suggestions(self, query, codebase_context, framework):
 
-        detected_framework = self.framework_detector.detect_framework_or_language(codebase_context)
-        app_domain = self.framework_detector.determine_app_domain_agnostic(codebase_context)
+        detected_framework = self._detect('detect_framework_or_language', codebase_context)
+        app_domain = self._detect('determine_app_domain_agnostic', codebase_context)
         
         return f"""
 
@@ -251,6 +431,7 @@ Ready to analyze your {detected_framework} codebase! 🚀
 
 class QueryRouter:
 
+    __slots__ = ('framework_detector',)
     
     def __init__(self, framework_detector):
         self.framework_detector = framework_detector
@@ -258,7 +439,6 @@ class QueryRouter:
     def route_query(self, query, codebase_context):
 
         query_lower = query.lower()
-        detected_framework = self.framework_detector.detect_framework_or_language(codebase_context)
 # Not the cleanest, but it does the job
         if any(word in query_lower for word in ['architecture', 'structure', 'overview']):
             return 'architecture'
@@ -286,15 +466,35 @@ class QueryRouter:
 
 class ContextAnalyzer:
 
+    __slots__ = ('framework_detector', '_context_scan')
     
     def __init__(self, framework_detector):
         self.framework_detector = framework_detector
+        # (codebase_context, (file_paths, total_lines)) for the last context scanned
+        self._context_scan = None
+    
+    def _scan_context(self, codebase_context):
+        # One scan of the context feeds complexity, file types and time estimates
+        if self._context_scan is not None and self._context_scan[0] == codebase_context:
+            return self._context_scan[1]
+        
+        file_paths = _FILEPATH_LINE_RE.findall(codebase_context)
+        first_line = _FIRST_FILEPATH_LINE_RE.match(codebase_context)
+        if first_line:
+            file_paths.insert(0, first_line.group(1))
+        
+        blank_lines = (len(_BLANK_LINE_RE.findall(codebase_context)) +
+                       (_BLANK_FIRST_LINE_RE.match(codebase_context) is not None))
+        total_lines = codebase_context.count('\n') + 1 - len(file_paths) - blank_lines
+        
+        scan = (file_paths, total_lines)
+        self._context_scan = (codebase_context, scan)
+        return scan
     
     def check_context_complexity(self, codebase_context):
 
-        lines = codebase_context.split('\n')
-        files_count = len([line for line in lines if line.startswith('filepath:///')])
-        total_lines = len([line for line in lines if line.strip() and not line.startswith('filepath:///')])
+        file_paths, total_lines = self._scan_context(codebase_context)
+        files_count = len(file_paths)
         
         if files_count > 1000 or total_lines > 100000:
             return 'very_high'
@@ -307,40 +507,27 @@ class ContextAnalyzer:
     
     def get_dominant_file_types(self, codebase_context):
 
-        file_types = {}
-        lines = codebase_context.split('\n')
-        
-        for line in lines:
-            if line.startswith('filepath:///'):
-                file_path = line.replace('filepath:///', '').replace(' /// /// ///', '')
-                file_ext = Path(file_path).suffix.lower()
-                file_types[file_ext] = file_types.get(file_ext, 0) + 1
+        file_paths, _ = self._scan_context(codebase_context)
+        file_types = Counter(
+            Path(file_path.replace('filepath:///', '').replace(' /// /// ///', '')).suffix.lower()
+            for file_path in file_paths
+        )
         
-        # Sort by frequency
-        sorted_types = sorted(file_types.items(), key=lambda x: x[1], reverse=True)
-        return sorted_types[:5]  # Return top 5 file types
+        # Top 5 by frequency, ties kept in first-seen order
+        return file_types.most_common(5)
     
     def estimate_analysis_time(self, query, codebase_context):
 
         complexity = self.check_context_complexity(codebase_context)
-        query_type = 'simple' if len(query.split()) < 5 else 'complex'
-        
-        time_estimates = {
-            ('low', 'simple'): '< 5 seconds',
-            ('low', 'complex'): '5-15 seconds',
-            ('medium', 'simple'): '10-20 seconds',
-            ('medium', 'complex'): '15-30 seconds',
-            ('high', 'simple'): '20-45 seconds',
-            ('high', 'complex'): '30-60 seconds',
-            ('very_high', 'simple'): '45-90 seconds',
-            ('very_high', 'complex'): '60-120 seconds'
-        }
+        is_complex = len(query.split()) >= 5
         
-        return time_estimates.get((complexity, query_type), '30-60 seconds')
+        estimates = _TIME_ESTIMATES.get(complexity)
+        return estimates[is_complex] if estimates else '30-60 seconds'
 
 
 class ResponseFormatter:
 
+    __slots__ = ()
     
     def __init__(self):
         pass
@@ -351,7 +538,7 @@ class ResponseFormatter:
             return "
         
         # Add timestamp and metadata
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        timestamp = _timestamp()
         formatted = f"""
 *Generated: {timestamp}*
 
@@ -380,4 +567,4 @@ class ResponseFormatter:
 
         elapsed_time = time.time() - start_time
         performance_note = f"\n\n---\n
-        return response + performance_note
\ No newline at end of file
+        return response + performance_note
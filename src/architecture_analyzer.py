@@ -3,7 +3,12 @@ Architecture Analyzer Module for CodeLve
 Handles comprehensive codebase architecture analysis and pattern detection
 """
 
+import heapq
 import json
+import re
+import sys
+from collections import Counter, defaultdict
+from functools import cached_property
 from pathlib import Path
 from .architecture_overview_generator import ArchitectureOverviewGenerator
 
@@ -16,6 +21,62 @@ except ImportError:
     from .onboarding_generator import OnboardingGenerator
     from .architecture_metrics import ArchitectureMetrics, ArchitecturePatternDetector, DependencyAnalyzer, CodebaseHealthAnalyzer, ArchitectureDocumentationGenerator
 
+# Declared-name patterns used while indexing, compiled once
+_CLASS_NAME_RE = re.compile(r'class\s+(\w+)')
+_FUNCTION_NAME_RE = re.compile(r'(?:function|const)\s+(\w+)')
+
+# Statement prefixes, after indentation, that mark import and export lines
+_IMPORT_PREFIXES = ('import ', 'from ')
+_EXPORT_PREFIXES = ('export', 'module.exports', 'exports.')
+
+# Import targets: the source after `from` (Python and ES modules), else the
+# name after a bare `import`
+_IMPORT_FROM_RE = re.compile(r'''\bfrom\s+['"]?([^\s'";]+)''')
+_IMPORT_NAME_RE = re.compile(r'''import\s+['"]?([^\s'",;]+)''')
+
+# Path words per architecture layer, in priority order. Paths are split into
+# words, so "viewport" no longer counts as a view
+_LAYER_TERMS = (
+    ('presentation', frozenset({'component', 'components', 'page', 'pages', 'view', 'views', 'ui'})),
+    ('business', frozenset({'service', 'services', 'controller', 'controllers', 'handler', 'handlers', 'business'})),
+    ('data', frozenset({'model', 'models', 'entity', 'entities', 'repository', 'repositories', 'dao', 'daos'})),
+    ('infrastructure', frozenset({'config', 'configs', 'configuration', 'util', 'utils', 'utilities',
+                                  'helper', 'helpers', 'middleware', 'middlewares'})),
+    ('shared', frozenset({'common', 'shared'})),
+)
+
+# Words in a path: separator-delimited parts, further split at camelCase humps
+_PATH_WORD_RE = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+')
+
+# Layer diagram appended to the layer counts, filled with each layer's count
+_LAYER_BOX_TEMPLATE = """
+┌─────────────────────────────────────────────────────────────┐
+│                    Presentation Layer                        │
+│  Components: {presentation} | Pages | Views | UI Elements        │
+├─────────────────────────────────────────────────────────────┤
+│                     Business Layer                          │
+│  Services: {business} | Logic | Domain | Controllers         │
+├─────────────────────────────────────────────────────────────┤
+│                       Data Layer                            │
+│  Models: {data} | Repositories | Entities | DAOs        │
+├─────────────────────────────────────────────────────────────┤
+│                  Infrastructure Layer                       │
+│  Config: {infrastructure} | Utils | Helpers | Middleware        │
+└─────────────────────────────────────────────────────────────┘"""
+
+# Module-name keywords that mark an entry point, matched case-insensitively
+_ENTRY_RE = re.compile(r'index|main|app|server|start', re.IGNORECASE)
+
+
+def _path_layer(path):
+    """Return the first layer with a term among the words of path, or None."""
+    words = {word.lower() for word in _PATH_WORD_RE.findall(path)}
+    for layer, terms in _LAYER_TERMS:
+        if not words.isdisjoint(terms):
+            return layer
+    return None
+
+
 class ArchitectureAnalyzer:
     """
     Comprehensive codebase architecture analyzer
@@ -25,21 +86,52 @@ class ArchitectureAnalyzer:
     def __init__(self, framework_detector):
         self.framework_detector = framework_detector
         
-        # Initialize sub-components
-        self.onboarding_generator = OnboardingGenerator(framework_detector)
-        self.overview_generator = ArchitectureOverviewGenerator(framework_detector)
-        self.metrics_analyzer = ArchitectureMetrics(framework_detector)
-        self.pattern_detector = ArchitecturePatternDetector(framework_detector)
-        self.dependency_analyzer = DependencyAnalyzer(framework_detector)
-        self.health_analyzer = CodebaseHealthAnalyzer(framework_detector)
-        self.doc_generator = ArchitectureDocumentationGenerator(framework_detector)
+        # (context, index) for the last context indexed, and
+        # (report kind, framework) -> (context, report) for finished reports
+        self._index_cache = None
+        self._report_cache = {}
+    
+    # Sub-components are built on first use; the overview report only needs
+    # the overview generator
+    
+    @cached_property
+    def onboarding_generator(self):
+        return OnboardingGenerator(self.framework_detector)
+    
+    @cached_property
+    def overview_generator(self):
+        return ArchitectureOverviewGenerator(self.framework_detector)
+    
+    @cached_property
+    def metrics_analyzer(self):
+        return ArchitectureMetrics(self.framework_detector)
+    
+    @cached_property
+    def pattern_detector(self):
+        return ArchitecturePatternDetector(self.framework_detector)
+    
+    @cached_property
+    def dependency_analyzer(self):
+        return DependencyAnalyzer(self.framework_detector)
+    
+    @cached_property
+    def health_analyzer(self):
+        return CodebaseHealthAnalyzer(self.framework_detector)
+    
+    @cached_property
+    def doc_generator(self):
+        return ArchitectureDocumentationGenerator(self.framework_detector)
     
     def check_codebase_architecture(self, codebase_context, framework):
 
+        cached = self._cached_report('overview', codebase_context, framework)
+        if cached is not None:
+            return cached
+        
         print("🏗️ Generating REAL architecture analysis with codebase indexing...")
         
         # Instead of using temp directory, analyze the context directly
-        index_data = self._index_from_context(codebase_context)
+        index_data = self._cached_index(codebase_context)
         
         # Generate the new system overview FIRST - this is what new developers need
         system_overview = self.overview_generator.generate_system_overview(
@@ -48,14 +140,19 @@ class ArchitectureAnalyzer:
         
         # For initial architecture query, just return the system overview
         # This is more digestible and users can ask for more details if needed
+        self._report_cache['overview', framework] = (codebase_context, system_overview)
         return system_overview
     
     def check_detailed_architecture(self, codebase_context, framework):
 
+        cached = self._cached_report('detailed', codebase_context, framework)
+        if cached is not None:
+            return cached
+        
         print("🏗️ Generating detailed architecture analysis...")
         
         # Index the codebase
-        index_data = self._index_from_context(codebase_context)
+        index_data = self._cached_index(codebase_context)
         
         # Generate all components
         system_overview = self.overview_generator.generate_system_overview(
@@ -74,7 +171,25 @@ class ArchitectureAnalyzer:
         health_report = self.health_analyzer.generate_health_report(codebase_context, index_data)
         
         # Combine all reports
-        return f"{system_overview}\n\n---\n\n{developer_guide}\n\n---\n\n{health_report}\n\n---\n\n{technical_analysis}"
+        report = f"{system_overview}\n\n---\n\n{developer_guide}\n\n---\n\n{health_report}\n\n---\n\n{technical_analysis}"
+        self._report_cache['detailed', framework] = (codebase_context, report)
+        return report
+    
+    def _cached_report(self, kind, codebase_context, framework):
+        # Reports are rebuilt only when the context changes. The cached context is
+        # compared by value; identical objects short-circuit.
+        cached = self._report_cache.get((kind, framework))
+        if cached is not None and cached[0] == codebase_context:
+            return cached[1]
+        return None
+    
+    def _cached_index(self, codebase_context):
+        # The overview and detailed reports share one index per context
+        if self._index_cache is not None and self._index_cache[0] == codebase_context:
+            return self._index_cache[1]
+        index_data = self._index_from_context(codebase_context)
+        self._index_cache = (codebase_context, index_data)
+        return index_data
     
     def _index_from_context(self, codebase_context):
 
@@ -82,27 +197,26 @@ class ArchitectureAnalyzer:
             'modules': {},
             'file_count': 0,
             'total_lines': 0,
-            'by_extension': {},
-            'by_directory': {},
+            'by_extension': Counter(),
+            'by_directory': defaultdict(list),
             'imports': {},
             'exports': {},
-            'entry_points': []
+            'entry_points': [],
+            'total_imports': 0,
+            'files_with_imports': 0,
+            'import_graph': {}
         }
         
         lines = codebase_context.split('\n')
         current_file = None
-        current_content = []
+        module_info = None
         in_file = False
         
         for line in lines:
             if line.startswith('filepath:///'):
-                # Save previous file if exists
-                if current_file and current_content:
-                    self._process_file(current_file, current_content, index)
-                
-                # Start new file
+                # Start new file; its module entry is opened on its first code line
                 current_file = line.replace('filepath:///', '').strip()
-                current_content = []
+                module_info = None
                 in_file = False
                 
             elif line.strip() == 'file code{':
@@ -112,18 +226,21 @@ class ArchitectureAnalyzer:
                 in_file = False
                 
             elif in_file:
-                current_content.append(line)
-        
-        # Process last file
-        if current_file and current_content:
-            self._process_file(current_file, current_content, index)
+                if module_info is None:
+                    if not current_file:
+                        continue
+                    module_info = self._init_file_entry(current_file, index)
+                self._consume_line(line, module_info, index)
         
         # Identify entry points
         self._identify_entry_points(index)
         
+        # Link modules that import each other
+        self._build_import_graph(index)
+        
         return index
     
-    def _process_file(self, file_path, content, index):
+    def _init_file_entry(self, file_path, index):
 
         path_obj = Path(file_path)
         module_name = path_obj.stem
@@ -131,58 +248,88 @@ class ArchitectureAnalyzer:
         
         # Update counts
         index['file_count'] += 1
-        index['total_lines'] += len(content)
         
         # Count by extension
-        if extension not in index['by_extension']:
-            index['by_extension'][extension] = 0
         index['by_extension'][extension] += 1
         
         # Group by directory
         if path_obj.parent:
             dir_name = str(path_obj.parent.name)
-            if dir_name not in index['by_directory']:
-                index['by_directory'][dir_name] = []
             index['by_directory'][dir_name].append(module_name)
-# FIXME: refactor when time permits
-        imports = []
-        exports = []
-        classes = []
-        functions = []
-        
-        for line in content:
-            if 'import' in line and ('from' in line or 'import ' in line):
-                imports.append(line.strip())
-            if 'export' in line:
-                exports.append(line.strip())
-            if 'class ' in line:
-                classes.append(self._get_name(line, 'class'))
-            if 'function ' in line or 'const ' in line:
-                functions.append(self._get_name(line, 'function|const'))
-        
-        # Store module info
-        index['modules'][module_name] = {
+        
+        # Keep the import totals in step with the stored modules; a repeated
+        # module name replaces the earlier entry
+        previous = index['modules'].get(module_name)
+        if previous is not None:
+            index['total_imports'] -= previous['import_count']
+            index['files_with_imports'] -= bool(previous['import_count'])
+        
+        # Store module info; _consume_line fills it in line by line
+        module_info = {
             'path': file_path,
-            'imports': imports,
-            'exports': exports,
-            'classes': classes,
-            'functions': functions,
-            'lines': len(content),
+            'imports': [],
+            'import_count': 0,
+            'exports': [],
+            'classes': [],
+            'functions': [],
+            'lines': 0,
             'extension': extension
         }
+        index['modules'][module_name] = module_info
+        return module_info
     
-    def _get_name(self, line, pattern):
+    def _consume_line(self, line, module_info, index):
 
-        import re
-        match = re.search(f'{pattern}\\s+(\\w+)', line)
+        module_info['lines'] += 1
+        index['total_lines'] += 1
+        
+        statement = line.lstrip()
+        if statement.startswith(_IMPORT_PREFIXES) and 'import' in statement:
+            module_info['imports'].append(sys.intern(statement.rstrip()))
+            module_info['import_count'] += 1
+            index['total_imports'] += 1
+            if module_info['import_count'] == 1:
+                index['files_with_imports'] += 1
+        if statement.startswith(_EXPORT_PREFIXES):
+            module_info['exports'].append(sys.intern(statement.rstrip()))
+        if 'class ' in line:
+            module_info['classes'].append(self._get_name(line, _CLASS_NAME_RE))
+        if 'function ' in line or 'const ' in line:
+            module_info['functions'].append(self._get_name(line, _FUNCTION_NAME_RE))
+    
+    def _build_import_graph(self, index):
+
+        modules = index['modules']
+        import_graph = index['import_graph']
+        
+        for module_name, module_info in modules.items():
+            deps = []
+            for imp in module_info['imports']:
+                dep = self._import_target(imp)
+                if dep in modules and dep != module_name and dep not in deps:
+                    deps.append(dep)
+            import_graph[module_name] = deps
+    
+    def _import_target(self, statement):
+
+        # Reduce an import statement to the module name it would be indexed under
+        match = _IMPORT_FROM_RE.search(statement) or _IMPORT_NAME_RE.match(statement)
+        if not match:
+            return None
+        target = match.group(1)
+        if '/' in target:
+            return Path(target).stem
+        return target.rsplit('.', 1)[-1]
+    
+    def _get_name(self, line, name_re):
+
+        match = name_re.search(line)
         return match.group(1) if match else None
     
     def _identify_entry_points(self, index):
 
-        entry_patterns = ['index', 'main', 'app', 'server', 'start']
-        
         for module_name in index['modules']:
-            if any(pattern in module_name.lower() for pattern in entry_patterns):
+            if _ENTRY_RE.search(module_name):
                 index['entry_points'].append(module_name)
     
     def _format_real_architecture_analysis(self, index_data, framework, codebase_context):
@@ -192,23 +339,25 @@ class ArchitectureAnalyzer:
         total_files = index_data['file_count']
         total_lines = index_data['total_lines']
         
-        # Get file distribution
+        # Get file distribution; only the eight largest extensions are shown
         file_dist = []
-        for ext, count in sorted(index_data['by_extension'].items(), key=lambda x: x[1], reverse=True):
+        for ext, count in index_data['by_extension'].most_common(8):
             percentage = (count / total_files * 100) if total_files > 0 else 0
             file_dist.append(f"• {ext}: {count} files ({percentage:.1f}%)")
         
         # Get module organization
         module_org = []
-        for dir_name, modules in sorted(index_data['by_directory'].items(), key=lambda x: len(x[1]), reverse=True)[:10]:
+        for dir_name, modules in heapq.nlargest(10, index_data['by_directory'].items(), key=lambda x: len(x[1])):
             module_list = ', '.join(modules[:3])
             if len(modules) > 3:
                 module_list += f" and {len(modules) - 3} more"
             module_org.append(f"• {dir_name} directory: {len(modules)} modules - {module_list}")
         
-        # Count total functions and classes
-        total_functions = sum(len(m.get('functions', [])) for m in index_data['modules'].values())
-        total_classes = sum(len(m.get('classes', [])) for m in index_data['modules'].values())
+        # Count total functions and classes, and the per-module figures the
+        # sections below need, in one sweep
+        module_stats = self._module_stats(index_data)
+        total_functions = module_stats['total_functions']
+        total_classes = module_stats['total_classes']
 # TODO: revisit this later
         patterns = self.pattern_detector.detect_patterns(codebase_context)
         metrics = self.metrics_analyzer.calculate_metrics(codebase_context, index_data)
@@ -225,7 +374,7 @@ Cyclomatic Complexity: {metrics.get('complexity', 'N/A')}
 Maintainability Index: {metrics.get('maintainability', 'N/A')}
 
 ## 📁 File Distribution
-{chr(10).join(file_dist[:8])}
+{chr(10).join(file_dist)}
 
 
 {self._check_layers(index_data)}
@@ -240,7 +389,7 @@ Maintainability Index: {metrics.get('maintainability', 'N/A')}
 Entry Points: {', '.join(index_data['entry_points']) if index_data['entry_points'] else 'Not identified'}
 Core Modules: {self._identify_core_modules(index_data)}
 
-{self._format_top_dependencies(index_data)}
+{self._format_top_dependencies(module_stats)}
 
 ## 📋 Module Organization
 {chr(10).join(module_org)}
@@ -249,7 +398,7 @@ Core Modules: {self._identify_core_modules(index_data)}
 {self._check_import_graph(index_data)}
 
 
-{self._generate_recommendations(index_data, metrics)}
+{self._generate_recommendations(index_data, module_stats)}
 
 📈 Architecture Quality: Based on ACTUAL code analysis"""
     
@@ -264,18 +413,10 @@ Core Modules: {self._identify_core_modules(index_data)}
         }
         
         # Count components by layer based on naming patterns
-        for module_name, info in index_data['modules'].items():
-            path_lower = info['path'].lower()
-            if any(term in path_lower for term in ['component', 'page', 'view', 'ui']):
-                layers['presentation'] += 1
-            elif any(term in path_lower for term in ['service', 'controller', 'handler', 'business']):
-                layers['business'] += 1
-            elif any(term in path_lower for term in ['model', 'entity', 'repository', 'dao']):
-                layers['data'] += 1
-            elif any(term in path_lower for term in ['config', 'util', 'helper', 'middleware']):
-                layers['infrastructure'] += 1
-            elif any(term in path_lower for term in ['common', 'shared']):
-                layers['shared'] += 1
+        for info in index_data['modules'].values():
+            layer = _path_layer(info['path'])
+            if layer is not None:
+                layers[layer] += 1
         
         layer_output = []
         for layer, count in layers.items():
@@ -283,66 +424,60 @@ Core Modules: {self._identify_core_modules(index_data)}
                 layer_output.append(f"• {layer.capitalize()} Layer: {count} components")
         
         # Add visual representation
-        visual = """
-┌─────────────────────────────────────────────────────────────┐
-│                    Presentation Layer                        │
-│  Components: """ + str(layers['presentation']) + """ | Pages | Views | UI Elements        │
-├─────────────────────────────────────────────────────────────┤
-│                     Business Layer                          │
-│  Services: """ + str(layers['business']) + """ | Logic | Domain | Controllers         │
-├─────────────────────────────────────────────────────────────┤
-│                       Data Layer                            │
-│  Models: """ + str(layers['data']) + """ | Repositories | Entities | DAOs        │
-├─────────────────────────────────────────────────────────────┤
-│                  Infrastructure Layer                       │
-│  Config: """ + str(layers['infrastructure']) + """ | Utils | Helpers | Middleware        │
-└─────────────────────────────────────────────────────────────┘"""
-        
-        return '\n'.join(layer_output) + '\n' + visual
+        return '\n'.join(layer_output) + '\n' + _LAYER_BOX_TEMPLATE.format_map(layers)
     
     def _identify_core_modules(self, index_data):
 
-        import_counts = {}
+        import_counts = Counter()
         
         for module_info in index_data['modules'].values():
             for imp in module_info.get('imports', []):
-# Not the cleanest, but it does the job
-                if 'from' in imp:
-                    parts = imp.split('from')
-                    if len(parts) > 1:
-                        module = parts[1].strip().split()[0].strip('"\'')
-                        if module.startswith('.'):
-                            continue  # Skip relative imports for now
-                        import_counts[module] = import_counts.get(module, 0) + 1
+                match = _IMPORT_FROM_RE.search(imp)
+                if match:
+                    module = match.group(1)
+                    if module.startswith('.'):
+                        continue  # Skip relative imports for now
+                    import_counts[module] += 1
         
         # Get top 5 most imported modules
-        top_modules = sorted(import_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        top_modules = import_counts.most_common(5)
         return ', '.join([m[0] for m in top_modules]) if top_modules else 'None identified'
     
-    def _format_top_dependencies(self, index_data):
+    def _module_stats(self, index_data):
 
-        dependency_counts = []
+        stats = {
+            'total_functions': 0,
+            'total_classes': 0,
+            'large_files': 0,
+            'dependency_counts': []
+        }
         
         for module_name, info in index_data['modules'].items():
-            import_count = len(info.get('imports', []))
-            if import_count > 10:  # Only show modules with many dependencies
-                dependency_counts.append((module_name, import_count))
-        
+            stats['total_functions'] += len(info['functions'])
+            stats['total_classes'] += len(info['classes'])
+            if info['lines'] > 500:
+                stats['large_files'] += 1
+            if info['import_count'] > 10:  # Only show modules with many dependencies
+                stats['dependency_counts'].append((module_name, info['import_count']))
+        
+        return stats
+    
+    def _format_top_dependencies(self, module_stats):
+
+        dependency_counts = module_stats['dependency_counts']
         dependency_counts.sort(key=lambda x: x[1], reverse=True)
         
         if not dependency_counts:
             return ""
         
-        output = "\nTop Module Dependencies:\n"
-        for name, count in dependency_counts[:10]:
-            output += f"\n{name:<40} ──→ {count} dependencies"
-        
-        return output
+        rows = ''.join(f"\n{name:<40} ──→ {count} dependencies" for name, count in dependency_counts[:10])
+        return f"\nTop Module Dependencies:\n{rows}"
     
     def _check_import_graph(self, index_data):
 
-        total_imports = sum(len(m.get('imports', [])) for m in index_data['modules'].values())
-        files_with_imports = sum(1 for m in index_data['modules'].values() if m.get('imports'))
+        circular_deps = self.dependency_analyzer.check_circular_dependencies(index_data['import_graph'])
+        total_imports = index_data['total_imports']
+        files_with_imports = index_data['files_with_imports']
         isolated_files = index_data['file_count'] - files_with_imports
         
         avg_deps = total_imports / files_with_imports if files_with_imports > 0 else 0
@@ -352,18 +487,17 @@ Core Modules: {self._identify_core_modules(index_data)}
 • Isolated Files: {isolated_files}
 • Average Dependencies: {avg_deps:.2f}
 • Coupling Level: {'High' if avg_deps > 10 else 'Medium' if avg_deps > 5 else 'Low'}
-• Circular Dependencies Found: 0"""
+• Circular Dependencies Found: {len(circular_deps)}"""
     
-    def _generate_recommendations(self, index_data, metrics):
+    def _generate_recommendations(self, index_data, module_stats):
 
         recommendations = []
 # Might need cleanup
-        large_files = [name for name, info in index_data['modules'].items() 
-                      if info.get('lines', 0) > 500]
+        large_files = module_stats['large_files']
         if large_files:
-            recommendations.append(f"• Refactoring: {len(large_files)} files exceed 500 lines")
+            recommendations.append(f"• Refactoring: {large_files} files exceed 500 lines")
 # TODO: revisit this later
-        isolated = index_data['file_count'] - sum(1 for m in index_data['modules'].values() if m.get('imports'))
+        isolated = index_data['file_count'] - index_data['files_with_imports']
         if isolated > 0:
             recommendations.append(f"• Integration: {isolated} files have no imports - review modularization")
 # TODO: revisit this later
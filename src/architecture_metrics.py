@@ -4,9 +4,87 @@ Provides advanced architectural analysis, pattern detection, and health metrics
 """
 
 import re
+from collections import Counter
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
+# Complexity keywords, one named group per indicator, matched in a single scan
+_COMPLEXITY_RE = re.compile(
+    r'\b(?:(?P<conditional>if|elif)|(?P<loop>for|while)|(?P<branch>case|switch)|(?P<exception>try))\b'
+)
+
+# Name/path terms per architecture layer, in priority order, one alternation each
+_LAYER_RES = tuple((layer, re.compile('|'.join(terms))) for layer, terms in (
+    ('presentation', ('component', 'view', 'page', 'ui', 'widget', 'screen', 'layout')),
+    ('business', ('service', 'controller', 'handler', 'manager', 'logic', 'processor')),
+    ('data', ('model', 'entity', 'repository', 'dao', 'schema', 'database')),
+    ('infrastructure', ('config', 'util', 'helper', 'middleware', 'adapter', 'provider')),
+    ('shared', ('common', 'shared', 'core', 'base', 'constants')),
+))
+
+# Module names that mark test files
+_TEST_NAME_RE = re.compile(r'test|spec', re.IGNORECASE)
+
+# Pattern rules as (label, predicate) in report order. Each predicate gets the
+# lowercased context and its lazily filled keyword counts.
+_ARCHITECTURE_PATTERN_RULES = (
+    ("**MVC (Model-View-Controller)** - Clear separation of concerns",
+     lambda text, counts: all(term in text for term in ('model', 'view', 'controller'))),
+    ("**Service-Oriented Architecture** - Modular service design",
+     lambda text, counts: counts['service'] > 5),
+    ("**Component-Based Architecture** - Reusable UI components",
+     lambda text, counts: counts['component'] > 10),
+    ("**Event-Driven Architecture** - Loose coupling through events",
+     lambda text, counts: any(term in text for term in ('event', 'listener', 'emitter', 'subscribe'))),
+    ("**Layered Architecture** - Organized in logical layers",
+     lambda text, counts: any(term in text for term in ('layer', 'tier', 'presentation', 'business', 'data'))),
+    ("**Repository Pattern** - Data access abstraction",
+     lambda text, counts: 'repository' in text),
+    # Microservices (if multiple service definitions)
+    ("**Microservices Architecture** - Distributed service design",
+     lambda text, counts: counts['service'] > 20 and 'api' in text),
+)
+
+_DESIGN_PATTERN_RULES = (
+    ("**Factory Pattern** - Object creation abstraction",
+     lambda text, counts: 'factory' in text or 'create' in text and 'return new' in text),
+    ("**Singleton Pattern** - Single instance guarantee",
+     lambda text, counts: 'singleton' in text or 'instance' in text and 'private constructor' in text),
+    ("**Observer Pattern** - Event subscription model",
+     lambda text, counts: any(term in text for term in ('observer', 'subscribe', 'notify', 'listener'))),
+    ("**Decorator Pattern** - Behavior extension",
+     lambda text, counts: 'decorator' in text or '@' in text and 'function' in text),
+    ("**Strategy Pattern** - Algorithm encapsulation",
+     lambda text, counts: 'strategy' in text or 'algorithm' in text),
+    ("**Adapter Pattern** - Interface compatibility",
+     lambda text, counts: 'adapter' in text or 'wrapper' in text),
+)
+
+
+class _KeywordCounts(dict):
+    """Occurrence counts of keywords in a text, each counted on first lookup."""
+    
+    __slots__ = ('text',)
+    
+    def __init__(self, text):
+        super().__init__()
+        self.text = text
+    
+    def __missing__(self, keyword):
+        count = self[keyword] = self.text.count(keyword)
+        return count
+
+
+def _matching_patterns(rules, content_lower):
+    """Return the labels of the rules whose predicate holds for content_lower."""
+    counts = _KeywordCounts(content_lower)
+    return [label for label, predicate in rules if predicate(content_lower, counts)]
+
+
+# Line prefixes, after indentation, that mark a comment line
+_COMMENT_PREFIXES = ('//', '#', '/*', '*')
+
+
 class ArchitectureMetrics:
 
     
@@ -15,13 +93,20 @@ class ArchitectureMetrics:
     
     def calculate_complexity_metrics(self, codebase_context):
 
-        lines = codebase_context.split('\n')
-        
-        # Count complexity indicators
-        if_count = sum(1 for line in lines if re.search(r'\b(if|elif)\b', line))
-        for_count = sum(1 for line in lines if re.search(r'\b(for|while)\b', line))
-        case_count = sum(1 for line in lines if re.search(r'\b(case|switch)\b', line))
-        try_count = sum(1 for line in lines if re.search(r'\btry\b', line))
+        # Count lines with each complexity indicator; a line counts once per
+        # indicator, keyed by the offset of the newline before it
+        counted = set()
+        line_counts = Counter()
+        for match in _COMPLEXITY_RE.finditer(codebase_context):
+            key = (match.lastgroup, codebase_context.rfind('\n', 0, match.start()))
+            if key not in counted:
+                counted.add(key)
+                line_counts[match.lastgroup] += 1
+        
+        if_count = line_counts['conditional']
+        for_count = line_counts['loop']
+        case_count = line_counts['branch']
+        try_count = line_counts['exception']
         
         # Basic cyclomatic complexity calculation
         complexity = 1 + if_count + for_count + case_count + try_count
@@ -43,12 +128,21 @@ class ArchitectureMetrics:
         lines = codebase_context.split('\n')
         total_lines = len(lines)
         
-        # Factors that improve maintainability
-        comment_lines = sum(1 for line in lines if line.strip().startswith(('//', '#', '/*', '*')))
-        
-        # Factors that decrease maintainability
-        long_lines = sum(1 for line in lines if len(line) > 120)
-        complex_lines = sum(1 for line in lines if line.count(';') > 1 or line.count('&&') > 2 or line.count('||') > 2)
+        # Factors that improve maintainability (comments) and decrease it (long
+        # and complex lines), counted in one pass
+        comment_lines = 0
+        long_lines = 0
+        complex_lines = 0
+        for line in lines:
+            if line.lstrip().startswith(_COMMENT_PREFIXES):
+                comment_lines += 1
+            if len(line) > 120:
+                long_lines += 1
+            # Containment checks first; most lines hold none of these operators
+            if (';' in line and line.count(';') > 1
+                    or '&&' in line and line.count('&&') > 2
+                    or '||' in line and line.count('||') > 2):
+                complex_lines += 1
         
         # Calculate score
         comment_ratio = (comment_lines / max(total_lines, 1)) * 100
@@ -67,70 +161,18 @@ class ArchitecturePatternDetector:
     def __init__(self, framework_detector):
         self.framework_detector = framework_detector
     
-    def detect_architectural_patterns(self, codebase_context):
+    def detect_architectural_patterns(self, codebase_context, content_lower=None):
 
-        patterns = []
-        content_lower = codebase_context.lower()
-        
-        # MVC Pattern
-        if all(term in content_lower for term in ['model', 'view', 'controller']):
-            patterns.append("**MVC (Model-View-Controller)** - Clear separation of concerns")
-        
-        # Service-Oriented Architecture
-        if 'service' in content_lower and content_lower.count('service') > 5:
-            patterns.append("**Service-Oriented Architecture** - Modular service design")
-        
-        # Component-Based Architecture
-        if 'component' in content_lower and content_lower.count('component') > 10:
-            patterns.append("**Component-Based Architecture** - Reusable UI components")
-        
-        # Event-Driven Architecture
-        if any(term in content_lower for term in ['event', 'listener', 'emitter', 'subscribe']):
-            patterns.append("**Event-Driven Architecture** - Loose coupling through events")
-        
-        # Layered Architecture
-        if any(term in content_lower for term in ['layer', 'tier', 'presentation', 'business', 'data']):
-            patterns.append("**Layered Architecture** - Organized in logical layers")
-        
-        # Repository Pattern
-        if 'repository' in content_lower:
-            patterns.append("**Repository Pattern** - Data access abstraction")
-        
-        # Microservices (if multiple service definitions)
-        if content_lower.count('service') > 20 and 'api' in content_lower:
-            patterns.append("**Microservices Architecture** - Distributed service design")
-        
+        if content_lower is None:
+            content_lower = codebase_context.lower()
+        patterns = _matching_patterns(_ARCHITECTURE_PATTERN_RULES, content_lower)
         return patterns if patterns else ["**Monolithic Architecture** - Single unified codebase"]
     
-    def check_design_patterns(self, codebase_context):
+    def check_design_patterns(self, codebase_context, content_lower=None):
 
-        patterns = []
-        content_lower = codebase_context.lower()
-        
-        # Factory Pattern
-        if 'factory' in content_lower or 'create' in content_lower and 'return new' in content_lower:
-            patterns.append("**Factory Pattern** - Object creation abstraction")
-        
-        # Singleton Pattern
-        if 'singleton' in content_lower or 'instance' in content_lower and 'private constructor' in content_lower:
-            patterns.append("**Singleton Pattern** - Single instance guarantee")
-        
-        # Observer Pattern
-        if any(term in content_lower for term in ['observer', 'subscribe', 'notify', 'listener']):
-            patterns.append("**Observer Pattern** - Event subscription model")
-        
-        # Decorator Pattern
-        if 'decorator' in content_lower or '@' in codebase_context and 'function' in content_lower:
-            patterns.append("**Decorator Pattern** - Behavior extension")
-        
-        # Strategy Pattern
-        if 'strategy' in content_lower or 'algorithm' in content_lower:
-            patterns.append("**Strategy Pattern** - Algorithm encapsulation")
-        
-        # Adapter Pattern
-        if 'adapter' in content_lower or 'wrapper' in content_lower:
-            patterns.append("**Adapter Pattern** - Interface compatibility")
-        
+        if content_lower is None:
+            content_lower = codebase_context.lower()
+        patterns = _matching_patterns(_DESIGN_PATTERN_RULES, content_lower)
         return patterns if patterns else ["**Basic Object-Oriented Design** - Standard OOP principles"]
     
     def check_architectural_layers(self, modules):
@@ -147,30 +189,10 @@ class ArchitecturePatternDetector:
             module_lower = module_name.lower()
             path_lower = module_info.get('path', '').lower()
             
-            # Presentation layer
-            if any(term in module_lower or term in path_lower for term in 
-                   ['component', 'view', 'page', 'ui', 'widget', 'screen', 'layout']):
-                layers['presentation'].append(module_name)
-            
-            # Business layer
-            elif any(term in module_lower or term in path_lower for term in 
-                     ['service', 'controller', 'handler', 'manager', 'logic', 'processor']):
-                layers['business'].append(module_name)
-            
-            # Data layer
-            elif any(term in module_lower or term in path_lower for term in 
-                     ['model', 'entity', 'repository', 'dao', 'schema', 'database']):
-                layers['data'].append(module_name)
-            
-            # Infrastructure layer
-            elif any(term in module_lower or term in path_lower for term in 
-                     ['config', 'util', 'helper', 'middleware', 'adapter', 'provider']):
-                layers['infrastructure'].append(module_name)
-            
-            # Shared layer
-            elif any(term in module_lower or term in path_lower for term in 
-                     ['common', 'shared', 'core', 'base', 'constants']):
-                layers['shared'].append(module_name)
+            for layer, layer_re in _LAYER_RES:
+                if layer_re.search(module_lower) or layer_re.search(path_lower):
+                    layers[layer].append(module_name)
+                    break
         
         return layers
 
@@ -213,32 +235,31 @@ class DependencyAnalyzer:
 
         circular_deps = []
         visited = set()
-        rec_stack = set()
         
-        def has_cycle(node, graph, path=[]):
-            visited.add(node)
-            rec_stack.add(node)
-            path.append(node)
+        # Iterative DFS: path is the current chain of modules, path_pos maps each
+        # module on it to its position, and stack holds each one's pending neighbors
+        for root in import_graph:
+            if root in visited:
+                continue
+            visited.add(root)
+            path = [root]
+            path_pos = {root: 0}
+            stack = [iter(import_graph[root])]
             
-            if node in graph:
-                for neighbor in graph[node]:
-                    if neighbor not in visited:
-                        if has_cycle(neighbor, graph, path):
-                            return True
-                    elif neighbor in rec_stack:
+            while stack:
+                for neighbor in stack[-1]:
+                    if neighbor in path_pos:
                         # Found cycle
-                        cycle_start = path.index(neighbor)
-                        cycle = path[cycle_start:] + [neighbor]
-                        circular_deps.append(cycle)
-                        return True
-            
-            path.pop()
-            rec_stack.remove(node)
-            return False
-# Might need cleanup
-        for node in import_graph:
-            if node not in visited:
-                has_cycle(node, import_graph)
+                        circular_deps.append(path[path_pos[neighbor]:] + [neighbor])
+                    elif neighbor not in visited:
+                        visited.add(neighbor)
+                        path_pos[neighbor] = len(path)
+                        path.append(neighbor)
+                        stack.append(iter(import_graph.get(neighbor, ())))
+                        break
+                else:
+                    stack.pop()
+                    del path_pos[path.pop()]
         
         return circular_deps
     
@@ -247,14 +268,10 @@ class DependencyAnalyzer:
         metrics = {}
         
         # Calculate afferent coupling (Ca) - modules that depend on this module
-        afferent = {module: 0 for module in modules}
-        for module, deps in import_graph.items():
-            for dep in deps:
-                if dep in afferent:
-                    afferent[dep] += 1
+        afferent = Counter(dep for deps in import_graph.values() for dep in deps)
         
         # Calculate efferent coupling (Ce) - modules this module depends on
-        efferent = {module: len(deps) for module, deps in import_graph.items()}
+        efferent = {module: len(deps) for module, deps in import_graph.items() if module in modules}
         
         # Calculate instability
         for module in modules:
@@ -283,9 +300,22 @@ class CodebaseHealthAnalyzer:
         self.metrics_analyzer = ArchitectureMetrics(framework_detector)
         self.pattern_detector = ArchitecturePatternDetector(framework_detector)
         self.dependency_analyzer = DependencyAnalyzer(framework_detector)
+        
+        # (context, index, report) for the last report generated
+        self._report_cache = None
     
     def generate_health_report(self, codebase_context, index_data):
 
+        # The report is rebuilt only when its inputs change. The context is compared
+        # by value (identical objects short-circuit); the index by identity, since
+        # ArchitectureAnalyzer hands out one index object per context.
+        cached = self._report_cache
+        if cached is not None and cached[1] is index_data and cached[0] == codebase_context:
+            return cached[2]
+        
+        # The keyword checks below all read one lowercased copy of the context
+        content_lower = codebase_context.lower()
+        
         # Calculate various metrics
         complexity = self.metrics_analyzer.calculate_complexity_metrics(codebase_context)
         maintainability = self.metrics_analyzer.calculate_maintainability_index(codebase_context)
@@ -294,12 +324,12 @@ class CodebaseHealthAnalyzer:
         
         # Calculate health score
         health_score = self._calculate_health_score(
-            complexity, maintainability, coupling, circular_deps, codebase_context
+            complexity, maintainability, coupling, circular_deps, content_lower
         )
 # Quick workaround for now
-        arch_patterns = self.pattern_detector.detect_architectural_patterns(codebase_context)
+        arch_patterns = self.pattern_detector.detect_architectural_patterns(codebase_context, content_lower)
         
-        return f"""## 🏥 **Codebase Health Report**
+        report = f"""## 🏥 **Codebase Health Report**
 
 ### **Overall Health Score: {health_score}/100**
 
@@ -311,7 +341,7 @@ class CodebaseHealthAnalyzer:
 - **Maintainability Index**: {maintainability}/100
 
 ### ✅ **Quality Indicators**
-{self._generate_quality_indicators(codebase_context, index_data)}
+{self._generate_quality_indicators(codebase_context, index_data, content_lower)}
 
 ### 🔗 **Coupling Analysis**
 - **Average Dependencies**: {coupling['average_dependencies']}
@@ -324,8 +354,10 @@ class CodebaseHealthAnalyzer:
 
 
 {self._generate_health_recommendations(health_score, complexity, coupling, circular_deps)}"""
+        self._report_cache = (codebase_context, index_data, report)
+        return report
     
-    def _calculate_health_score(self, complexity, maintainability, coupling, circular_deps, codebase_context):
+    def _calculate_health_score(self, complexity, maintainability, coupling, circular_deps, content_lower):
 
         score = 100
         
@@ -352,15 +384,14 @@ class CodebaseHealthAnalyzer:
             score -= min(len(circular_deps) * 2, 10)
         
         # Test coverage impact
-        if 'test' not in codebase_context.lower():
+        if 'test' not in content_lower:
             score -= 10
         
         return max(0, min(100, score))
     
-    def _generate_quality_indicators(self, codebase_context, index_data):
+    def _generate_quality_indicators(self, codebase_context, index_data, content_lower):
 
         indicators = []
-        content_lower = codebase_context.lower()
 # Not the cleanest, but it does the job
         has_tests = 'test' in content_lower or 'spec' in content_lower
         indicators.append(f"- **Has Tests**: {'✅ Yes' if has_tests else '
@@ -376,8 +407,9 @@ class CodebaseHealthAnalyzer:
         
         # Estimate test coverage
         if has_tests:
-            test_files = [m for m in index_data.get('modules', {}) if 'test' in m.lower() or 'spec' in m.lower()]
-            test_coverage = round(len(test_files) / max(len(index_data.get('modules', {})), 1) * 100)
+            modules = index_data.get('modules', {})
+            test_files = sum(1 for m in modules if _TEST_NAME_RE.search(m))
+            test_coverage = round(test_files / max(len(modules), 1) * 100)
         else:
             test_coverage = 0
         indicators.append(f"- **Estimated Test Coverage**: {test_coverage}%")
@@ -7,6 +7,8 @@ import torch
 import time
 import re
 import json
+import importlib.util
+from functools import cached_property
 from pathlib import Path
 
 # Import our modular components
@@ -44,11 +46,39 @@ class HuggingFaceAIClient:
         # Load models on initialization
         self._load_models()
     
+    def _quantized_load_kwargs(self):
+        # 8-bit weights need bitsandbytes and a CUDA device; otherwise load full precision
+        if self.device != "cuda":
+            return {}
+        # device_map='auto' is implemented by accelerate, so both must be present
+        if importlib.util.find_spec("bitsandbytes") is None or importlib.util.find_spec("accelerate") is None:
+            return {}
+        try:
+            from transformers import BitsAndBytesConfig
+        except ImportError:
+            return {}
+        return {'quantization_config': BitsAndBytesConfig(load_in_8bit=True), 'device_map': 'auto'}
+    
+    def _load_causal_lm(self, model_name, quant_kwargs):
+        # Try the quantized load once; a broken bitsandbytes/accelerate install falls back to full precision
+        from transformers import AutoModelForCausalLM
+        if quant_kwargs:
+            try:
+                return AutoModelForCausalLM.from_pretrained(model_name, **quant_kwargs)
+            except Exception as quant_error:
+                print(f"⚠️ 8-bit loading failed, using full precision: {quant_error}")
+        model = AutoModelForCausalLM.from_pretrained(model_name)
+        model.to(self.device)
+        return model
+    
     def _load_models(self):
 
         try:
             from transformers import AutoTokenizer, AutoModelForCausalLM
             
+            # Applied to the 1.3B code model, used by both Layer 2 and the single-model fallback
+            quant_kwargs = self._quantized_load_kwargs()
+            
             print("🔧 Loading CodeLve Dual-LLM Architecture...")
             print(f"📱 Device: {self.device}")
             
@@ -69,12 +99,11 @@ class HuggingFaceAIClient:
                 # Load Code Analysis Model (Layer 2)
                 print(f"
                 self.code_tokenizer = AutoTokenizer.from_pretrained(self.code_analyzer_model)
-                self.code_model = AutoModelForCausalLM.from_pretrained(self.code_analyzer_model)
+                self.code_model = self._load_causal_lm(self.code_analyzer_model, quant_kwargs)
                 
                 if self.code_tokenizer.pad_token is None:
                     self.code_tokenizer.pad_token = self.code_tokenizer.eos_token
                 
-                self.code_model.to(self.device)
                 self.code_model.eval()
                 print("✅ Code Analysis Layer ready!")
                 print("🚀 Dual-LLM Architecture loaded successfully!")
@@ -87,12 +116,11 @@ class HuggingFaceAIClient:
                 # Fallback to single model (original implementation)
                 print(f"
                 self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-                self.model = AutoModelForCausalLM.from_pretrained(self.model_name)
+                self.model = self._load_causal_lm(self.model_name, quant_kwargs)
                 
                 if self.tokenizer.pad_token is None:
                     self.tokenizer.pad_token = self.tokenizer.eos_token
                 
-                self.model.to(self.device)
                 self.model.eval()
                 print("✅ Code-LLM single model fallback ready!")
             
@@ -103,6 +131,11 @@ class HuggingFaceAIClient:
             self.model = None
             self.tokenizer = None
     
+    @cached_property
+    def analysis_pipeline(self):
+        from .analysis_pipeline import AnalysisPipeline
+        return AnalysisPipeline(self, self.framework_detector)
+    
     def get_status(self):
 
         if self.prompt_model and self.code_model:
@@ -129,9 +162,8 @@ class HuggingFaceAIClient:
         try:
             print(f"🔄 Processing query through enhanced pipeline...")
             
-            # Import analysis pipeline when needed
-            from .analysis_pipeline import AnalysisPipeline
-            pipeline = AnalysisPipeline(self, self.framework_detector)
+            # Analysis pipeline is built on first use and reused across queries
+            pipeline = self.analysis_pipeline
             
             # PRIMARY: Use Framework-Agnostic Analysis (Proven to work)
             print("
@@ -184,14 +216,12 @@ class HuggingFaceAIClient:
                 return self._check_with_engineered_prompt(engineered_prompt, codebase_context)
             else:
                 # Fallback to framework-agnostic pipeline
-                from .analysis_pipeline import AnalysisPipeline
-                pipeline = AnalysisPipeline(self, self.framework_detector)
+                pipeline = self.analysis_pipeline
                 return pipeline.framework_agnostic_analysis_pipeline(query, codebase_context)
                 
         except Exception as e:
             print(f"⚠️ Dual-LLM failed: {e}, falling back to framework-agnostic analysis")
-            from .analysis_pipeline import AnalysisPipeline
-            pipeline = AnalysisPipeline(self, self.framework_detector)
+            pipeline = self.analysis_pipeline
             return pipeline.framework_agnostic_analysis_pipeline(query, codebase_context)
     
     def _engineer_prompt(self, user_query, codebase_context):
@@ -324,8 +354,7 @@ Focus on delivering practical value for {detected_framework} software developmen
         try:
             if not self.code_model or not self.code_tokenizer:
                 print("⚠️ Code analysis model not available, using framework-agnostic analysis")
-                from .analysis_pipeline import AnalysisPipeline
-                pipeline = AnalysisPipeline(self, self.framework_detector)
+                pipeline = self.analysis_pipeline
                 return pipeline.framework_agnostic_analysis_pipeline(engineered_prompt, codebase_context)
             
             # Enhanced context selection for architecture queries
@@ -464,14 +493,12 @@ ANALYSIS:"""
                 return f"🔬 **CodeLve Dual-LLM Analysis**\n\n{analysis}"
             else:
                 # Fallback to framework-agnostic analysis if output is poor
-                from .analysis_pipeline import AnalysisPipeline
-                pipeline = AnalysisPipeline(self, self.framework_detector)
+                pipeline = self.analysis_pipeline
                 return pipeline.framework_agnostic_analysis_pipeline(engineered_prompt, codebase_context)
                 
         except Exception as e:
             print(f"⚠️ Code analysis failed: {e}, using framework-agnostic analysis")
-            from .analysis_pipeline import AnalysisPipeline
-            pipeline = AnalysisPipeline(self, self.framework_detector)
+            pipeline = self.analysis_pipeline
             return pipeline.framework_agnostic_analysis_pipeline(engineered_prompt, codebase_context)
     
     # QUERY TYPE DETECTION (Framework Agnostic) - Keep these in main class for template prompts
@@ -1,17 +1,24 @@
 """Query Processors Package"""
 
-from .code_generator import CodeGenerator
-from .diagram_generator import DiagramGenerator
-from .walkthrough_generator import WalkthroughGenerator
-from .pattern_analyzer import PatternAnalyzer
-from .api_analyzer import ApiAnalyzer
-from .learning_path_generator import LearningPathGenerator
+from importlib import import_module
 
-__all__ = [
-    'CodeGenerator',
-    'DiagramGenerator', 
-    'WalkthroughGenerator',
-    'PatternAnalyzer',
-    'ApiAnalyzer',
-    'LearningPathGenerator'
-]
\ No newline at end of file
+# Exported name -> submodule; submodules are imported on first access
+_EXPORTS = {
+    'CodeIndex': 'code_index',
+    'CodeGenerator': 'code_generator',
+    'DiagramGenerator': 'diagram_generator',
+    'WalkthroughGenerator': 'walkthrough_generator',
+    'PatternAnalyzer': 'pattern_analyzer',
+    'ApiAnalyzer': 'api_analyzer',
+    'LearningPathGenerator': 'learning_path_generator'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
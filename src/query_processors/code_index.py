@@ -0,0 +1,44 @@
+"""
+Shared code index for CodeLve query processors.
+Splits the consolidated code into per-file sections once so every processor reuses the same parse.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, List
+
+
+# Header line that starts each file section in the consolidated code
+_FILE_HEADER_RE = re.compile(r'#\s*File:\s*(.+?)(?:\n|$)')
+
+
+@dataclass
+class CodeIndex:
+
+    code: str
+    file_lines: Dict[str, List[str]] = field(default_factory=dict)
+
+    @classmethod
+    def from_code(cls, code: str) -> 'CodeIndex':
+
+        file_lines = {}
+        current_lines = None
+
+        for line in code.split('\n'):
+            file_match = _FILE_HEADER_RE.match(line)
+            if file_match:
+                current_file = file_match.group(1).strip()
+                current_lines = None
+                if current_file:
+                    # A repeated header starts the file over; the last section wins
+                    current_lines = file_lines[current_file] = []
+            elif current_lines is not None:
+                current_lines.append(line)
+
+        return cls(code, file_lines)
+
+    @cached_property
+    def files(self) -> Dict[str, str]:
+
+        return {path: '\n'.join(lines) for path, lines in self.file_lines.items()}
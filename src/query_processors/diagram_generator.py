@@ -7,13 +7,16 @@ import re
 from typing import Dict, List, Set, Optional, Tuple, Any
 from collections import defaultdict
 
+from .code_index import CodeIndex
+
 
 class DiagramGenerator:
 
     
-    def __init__(self, consolidated_code: str):
+    def __init__(self, consolidated_code: str, code_index: Optional[CodeIndex] = None):
     # FIXME: refactor when time permits
         self.consolidated_code = consolidated_code
+        self.code_index = code_index or CodeIndex.from_code(consolidated_code)
         self.modules = self._get_modules()
         self.dependencies = self._check_dependencies()
         self.classes = self._get_classes()
@@ -21,21 +24,7 @@ class DiagramGenerator:
     
     def _get_modules(self) -> Dict[str, List[str]]:
 
-        modules = defaultdict(list)
-        
-        # Pattern to match file headers
-        file_pattern = r'#\s*File:\s*(.+?)(?:\n|$)'
-        current_file = None
-        
-        for line in self.consolidated_code.split('\n'):
-            file_match = re.match(file_pattern, line)
-            if file_match:
-                current_file = file_match.group(1).strip()
-                modules[current_file] = []
-            elif current_file:
-                modules[current_file].append(line)
-        
-        return dict(modules)
+        return self.code_index.file_lines
     
     def _check_dependencies(self) -> Dict[str, Set[str]]:
 
@@ -7,13 +7,16 @@ import re
 from typing import Dict, List, Set, Optional, Tuple, Any
 from collections import defaultdict, deque
 
+from .code_index import CodeIndex
+
 
 class LearningPathGenerator:
 
     
-    def __init__(self, consolidated_code: str):
+    def __init__(self, consolidated_code: str, code_index: Optional[CodeIndex] = None):
     # Not the cleanest, but it does the job
         self.consolidated_code = consolidated_code
+        self.code_index = code_index or CodeIndex.from_code(consolidated_code)
         self.modules = self._get_modules()
         self.dependencies = self._build_dependency_graph()
         self.complexity_scores = self._calculate_complexity()
@@ -22,32 +25,12 @@ class LearningPathGenerator:
     def _get_modules(self) -> Dict[str, Dict[str, Any]]:
 
         modules = {}
-        current_file = None
-        current_content = []
-        
-        file_pattern = r'#\s*File:\s*(.+?)(?:\n|$)'
-        
-        for line in self.consolidated_code.split('\n'):
-            file_match = re.match(file_pattern, line)
-            if file_match:
-                if current_file:
-                    modules[current_file] = {
-                        'content': '\n'.join(current_content),
-                        'imports': self._get_imports('\n'.join(current_content)),
-                        'exports': self._get_exports('\n'.join(current_content)),
-                        'concepts': [],
-                        'complexity': 0
-                    }
-                current_file = file_match.group(1).strip()
-                current_content = []
-            elif current_file:
-                current_content.append(line)
-        
-        if current_file:
-            modules[current_file] = {
-                'content': '\n'.join(current_content),
-                'imports': self._get_imports('\n'.join(current_content)),
-                'exports': self._get_exports('\n'.join(current_content)),
+        
+        for module_path, content in self.code_index.files.items():
+            modules[module_path] = {
+                'content': content,
+                'imports': self._get_imports(content),
+                'exports': self._get_exports(content),
                 'concepts': [],
                 'complexity': 0
             }
@@ -7,38 +7,22 @@ import re
 from typing import Dict, List, Optional, Any
 from collections import defaultdict
 
+from .code_index import CodeIndex
+
 
 class WalkthroughGenerator:
 
     
-    def __init__(self, consolidated_code: str):
+    def __init__(self, consolidated_code: str, code_index: Optional[CodeIndex] = None):
     # Works, but could be neater
         self.consolidated_code = consolidated_code
+        self.code_index = code_index or CodeIndex.from_code(consolidated_code)
         self.file_structure = self._get_file_structure()
         self.patterns = self._get_patterns()
     
     def _get_file_structure(self) -> Dict[str, str]:
 
-        files = {}
-        current_file = None
-        current_content = []
-        
-        file_pattern = r'#\s*File:\s*(.+?)(?:\n|$)'
-        
-        for line in self.consolidated_code.split('\n'):
-            file_match = re.match(file_pattern, line)
-            if file_match:
-                if current_file:
-                    files[current_file] = '\n'.join(current_content)
-                current_file = file_match.group(1).strip()
-                current_content = []
-            elif current_file:
-                current_content.append(line)
-        
-        if current_file:
-            files[current_file] = '\n'.join(current_content)
-        
-        return files
+        return self.code_index.files
     
     def _get_patterns(self) -> Dict[str, Any]:
 